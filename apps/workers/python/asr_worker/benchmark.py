@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+ASR Benchmark - Real-time factor and WER per inference backend
+Transcribes a fixed local corpus (<name>.wav + <name>.txt reference pairs) with each
+compute type and reports RTF and word error rate against the float32 baseline.
+
+    python benchmark.py --corpus ./bench_corpus --compute-types float32,int8,int8_float32
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+import whisperx
+
+from model_registry import load_whisper_backend
+
+SAMPLE_RATE = 16000
+
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over words divided by reference length"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_corpus(corpus_dir: Path) -> List[Dict]:
+    corpus = []
+    for wav in sorted(corpus_dir.glob("*.wav")):
+        reference = wav.with_suffix(".txt")
+        if not reference.exists():
+            continue
+        corpus.append({
+            "name": wav.stem,
+            "audio": whisperx.load_audio(str(wav)),
+            "reference": reference.read_text().strip(),
+        })
+    return corpus
+
+
+def run_backend(corpus: List[Dict], model_size: str, device: str, compute_type: str, args) -> Dict:
+    model = load_whisper_backend(model_size, device, compute_type, args.intra_op_threads, args.inter_op_threads)
+
+    # Warm up so one-time initialisation is not billed to the first file
+    model.transcribe(corpus[0]["audio"][:SAMPLE_RATE * 5], language=args.language, batch_size=args.batch_size)
+
+    audio_seconds = 0.0
+    elapsed = 0.0
+    errors = []
+    for item in corpus:
+        started = time.perf_counter()
+        result = model.transcribe(item["audio"], language=args.language, batch_size=args.batch_size)
+        elapsed += time.perf_counter() - started
+        audio_seconds += len(item["audio"]) / SAMPLE_RATE
+
+        hypothesis = " ".join(segment["text"].strip() for segment in result["segments"])
+        errors.append(word_error_rate(item["reference"], hypothesis))
+
+    return {
+        "compute_type": compute_type,
+        "rtf": elapsed / audio_seconds if audio_seconds else 0.0,
+        "wer": sum(errors) / len(errors),
+        "audio_seconds": audio_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="Directory of .wav files with .txt references")
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--compute-types", default="float32,int8,int8_float32")
+    parser.add_argument("--intra-op-threads", type=int, default=4)
+    parser.add_argument("--inter-op-threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit(f"No .wav/.txt pairs found in {args.corpus}")
+
+    results = [
+        run_backend(corpus, args.model_size, args.device, compute_type.strip(), args)
+        for compute_type in args.compute_types.split(",")
+    ]
+    baseline = next((r for r in results if r["compute_type"] == "float32"), results[0])
+
+    print(f"{len(corpus)} files, {baseline['audio_seconds']:.0f}s audio, model={args.model_size}, device={args.device}, "
+          f"threads={args.intra_op_threads}/{args.inter_op_threads}")
+    print(f"{'compute_type':<14}{'RTF':>8}{'speedup':>10}{'WER':>8}{'dWER':>8}")
+    for r in results:
+        speedup = baseline["rtf"] / r["rtf"] if r["rtf"] else 0.0
+        print(f"{r['compute_type']:<14}{r['rtf']:>8.3f}{speedup:>9.2f}x{r['wer']:>8.3f}{r['wer'] - baseline['wer']:>+8.3f}")
+
+
+if __name__ == "__main__":
+    main()
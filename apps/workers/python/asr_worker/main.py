@@ -5,14 +5,21 @@ Handles audio transcription with word-level timestamps and language detection.
 """
 
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
-import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 
+import numpy as np
 import whisperx
 import torch
 from fastapi import FastAPI, HTTPException, BackgroundTasks
@@ -20,6 +27,12 @@ from pydantic import BaseModel
 import redis.asyncio as redis
 from nats.aio.client import Client as NATS
 
+from workers.audio_cache import SharedAudioCache
+from workers.fetch import media_fetcher
+from model_registry import AlignModelCache, load_whisper_backend
+from scheduler import AsrBatchScheduler
+from vad import SAMPLE_RATE, energy_vad, assign_single_speaker, chunk_boundaries
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,127 +46,296 @@ NATS_URL = os.getenv("NATS_URL", "nats://localhost:4222")
 MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 BATCH_SIZE = 16
+COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "float16" if DEVICE == "cuda" else "float32")
+INTRA_OP_THREADS = int(os.getenv("ASR_INTRA_OP_THREADS", str(os.cpu_count() or 4)))
+INTER_OP_THREADS = int(os.getenv("ASR_INTER_OP_THREADS", "1"))
+ALIGN_MODEL_CACHE_MB = int(os.getenv("ALIGN_MODEL_CACHE_MB", "2048"))
+INFERENCE_WORKERS = int(os.getenv("ASR_INFERENCE_WORKERS", str(INTER_OP_THREADS + 1)))  # one per CTranslate2 worker plus preprocessing
+MAX_CONCURRENT_TASKS = int(os.getenv("ASR_MAX_CONCURRENT_TASKS", "4"))
+MAX_QUEUED_TASKS = int(os.getenv("ASR_MAX_QUEUED_TASKS", "16"))
+ASR_BATCHING_ENABLED = os.getenv("ASR_BATCHING_ENABLED", "true").lower() == "true"
+ASR_BATCH_MAX_WAIT_MS = float(os.getenv("ASR_BATCH_MAX_WAIT_MS", "50"))
+ASR_CHUNK_SECONDS = float(os.getenv("ASR_CHUNK_SECONDS", "30"))
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600)))
+LANGUAGE_DETECT_SECONDS = float(os.getenv("LANGUAGE_DETECT_SECONDS", "30"))
+LANGUAGE_DETECT_WINDOWS = int(os.getenv("LANGUAGE_DETECT_WINDOWS", "1"))
+VAD_BACKEND = os.getenv("VAD_BACKEND", "diarization")  # "diarization" or "energy"
+HF_TOKEN = os.getenv("HF_TOKEN")
+DIARIZATION_RETRY_SECONDS = float(os.getenv("DIARIZATION_RETRY_SECONDS", "60"))  # after a failed pipeline load
+ALIGN_PRELOAD_LANGUAGES = [lang.strip() for lang in os.getenv("ALIGN_PRELOAD_LANGUAGES", "en").split(",") if lang.strip()]
 
 # Global variables
 redis_client: Optional[redis.Redis] = None
 nats_client: Optional[NATS] = None
 whisper_model = None
+whisper_model_lock = threading.Lock()
+# CTranslate2 runs up to num_workers (INTER_OP_THREADS) calls in parallel and queues the rest itself,
+# so direct model calls only take the lock with a single worker. The WhisperX pipeline's transcribe
+# swaps its tokenizer and options per call and keeps whisper_model_lock.
+ctranslate2_lock = whisper_model_lock if INTER_OP_THREADS <= 1 else nullcontext()
+asr_scheduler: Optional[AsrBatchScheduler] = None
+diarize_model = None
+diarize_load_error: Optional[str] = None
+diarize_load_failed_at: Optional[float] = None
+diarize_model_lock = threading.Lock()
+align_model_cache: Optional[AlignModelCache] = None
+inference_executor: Optional[ThreadPoolExecutor] = None
+task_slots = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+active_tasks = 0
+transcript_cache_stats = {"hits": 0, "misses": 0}
+audio_cache: Optional[SharedAudioCache] = None
 
 class AudioProcessingRequest(BaseModel):
     session_id: str
     audio_url: str
     language: Optional[str] = None
     vad_enabled: bool = True
+    num_speakers: int = 1
     word_timestamps: bool = True
+    chunked: bool = False
 
 class AudioProcessingResponse(BaseModel):
     session_id: str
     task_id: str
     status: str
     message: str
+    queue_position: int = 0
+
+async def run_inference(func, *args, **kwargs):
+    """Run blocking model work on the inference pool so the event loop stays responsive"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, functools.partial(func, *args, **kwargs))
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str):
+    """Record wall-clock seconds spent in a pipeline stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(timings.get(stage, 0.0) + time.perf_counter() - started, 3)
 
 async def load_whisper_model():
     """Load WhisperX model globally"""
     global whisper_model
     try:
-        logger.info(f"Loading WhisperX model: {MODEL_SIZE} on {DEVICE}")
-        whisper_model = whisperx.load_model(MODEL_SIZE, DEVICE, compute_type="float16" if DEVICE == "cuda" else "float32")
+        logger.info(f"Loading WhisperX model: {MODEL_SIZE} on {DEVICE} ({COMPUTE_TYPE}, {INTRA_OP_THREADS} intra-op / {INTER_OP_THREADS} inter-op threads)")
+        whisper_model = load_whisper_backend(MODEL_SIZE, DEVICE, COMPUTE_TYPE, INTRA_OP_THREADS, INTER_OP_THREADS)
         logger.info("WhisperX model loaded successfully")
     except Exception as e:
         logger.error(f"Failed to load WhisperX model: {e}")
         raise
 
+def load_diarization_model():
+    """Load the WhisperX diarization pipeline once per worker; after a failure, retry at most every DIARIZATION_RETRY_SECONDS"""
+    global diarize_model, diarize_load_error, diarize_load_failed_at
+    with diarize_model_lock:
+        if diarize_model is not None:
+            return diarize_model
+        if diarize_load_failed_at is not None and time.monotonic() - diarize_load_failed_at < DIARIZATION_RETRY_SECONDS:
+            raise RuntimeError(f"Diarization pipeline unavailable: {diarize_load_error}")
+        try:
+            logger.info(f"Loading diarization pipeline on {DEVICE}")
+            diarize_model = whisperx.DiarizationPipeline(use_auth_token=HF_TOKEN, device=DEVICE)
+            diarize_load_error, diarize_load_failed_at = None, None
+            logger.info("Diarization pipeline loaded successfully")
+        except Exception as e:
+            diarize_load_error, diarize_load_failed_at = str(e), time.monotonic()
+            logger.error(f"Failed to load diarization pipeline: {e}")
+            raise
+    return diarize_model
+
 async def download_audio(audio_url: str) -> str:
     """Download audio file from URL to temporary file"""
-    import requests
-    
     try:
-        response = requests.get(audio_url, stream=True)
-        response.raise_for_status()
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        temp_path = temp_file.name
-        temp_file.close()
-        
-        # Write audio data
-        with open(temp_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        logger.info(f"Downloaded audio to: {temp_path}")
+        temp_path, stats = await media_fetcher.fetch_to_tempfile(audio_url, suffix=".wav")
+        logger.info(f"Downloaded audio to: {temp_path} ({stats.megabytes_per_second:.1f} MB/s)")
         return temp_path
     except Exception as e:
         logger.error(f"Failed to download audio: {e}")
         raise
 
-async def detect_language(audio_path: str) -> str:
-    """Detect language of audio using WhisperX"""
+def transcript_cache_key(content_key: str, request: AudioProcessingRequest) -> str:
+    """Hash the audio content key together with every setting that changes the transcript"""
+    settings = [
+        content_key,
+        MODEL_SIZE,
+        COMPUTE_TYPE,
+        request.language or "auto",
+        f"vad={request.vad_enabled}:{VAD_BACKEND}:{request.num_speakers}",
+        f"words={request.word_timestamps}",
+    ]
+    return hashlib.sha256("|".join(settings).encode()).hexdigest()
+
+def language_detection_windows(audio: np.ndarray) -> List[np.ndarray]:
+    """Cut voiced-audio windows of LANGUAGE_DETECT_SECONDS for language detection"""
+    window_samples = int(LANGUAGE_DETECT_SECONDS * SAMPLE_RATE)
+    regions = energy_vad(audio)
+    if regions:
+        voiced = np.concatenate([audio[int(r["start"] * SAMPLE_RATE):int(r["end"] * SAMPLE_RATE)] for r in regions])
+    else:
+        voiced = audio
+    
+    if LANGUAGE_DETECT_WINDOWS <= 1 or len(voiced) <= window_samples:
+        return [voiced[:window_samples]]
+    
+    # Spread the windows evenly over the voiced audio
+    offsets = np.linspace(0, len(voiced) - window_samples, LANGUAGE_DETECT_WINDOWS).astype(int)
+    return [voiced[offset:offset + window_samples] for offset in offsets]
+
+def vote_language(audio: np.ndarray) -> Counter:
+    """Run Whisper language ID on each detection window and count the votes"""
+    votes = Counter()
+    for window in language_detection_windows(audio):
+        with ctranslate2_lock:
+            votes[whisper_model.detect_language(window)] += 1
+    return votes
+
+async def detect_language(audio: np.ndarray) -> str:
+    """Detect language from a bounded voiced prefix (or a vote over several windows)"""
     try:
-        # Load audio
-        audio = whisperx.load_audio(audio_path)
-        
-        # Detect language
-        result = whisper_model.transcribe(audio, language=None)
-        detected_language = result["language"]
-        
-        logger.info(f"Detected language: {detected_language}")
+        votes = await run_inference(vote_language, audio)
+        detected_language = votes.most_common(1)[0][0]
+        logger.info(f"Detected language: {detected_language} (votes: {dict(votes)})")
         return detected_language
     except Exception as e:
         logger.error(f"Language detection failed: {e}")
         return "en"  # Default to English
 
-async def transcribe_audio(audio_path: str, language: str, vad_enabled: bool = True, word_timestamps: bool = True) -> Dict[str, Any]:
+def transcribe_segments(audio: np.ndarray, language: str) -> Dict[str, Any]:
+    """Run WhisperX transcription for one session"""
+    with whisper_model_lock:
+        return whisper_model.transcribe(audio, language=language, batch_size=BATCH_SIZE)
+
+def align_words(result: Dict[str, Any], audio: np.ndarray, language: str) -> Dict[str, Any]:
+    """Align segment text to word-level timestamps"""
+    model_a, metadata = align_model_cache.get(language)
+    return whisperx.align(result["segments"], model_a, metadata, audio, DEVICE, return_char_alignments=False)
+
+def apply_vad(result: Dict[str, Any], audio: np.ndarray, num_speakers: int) -> Dict[str, Any]:
+    """Assign speakers with the energy VAD (single speaker) or the diarization pipeline"""
+    if VAD_BACKEND == "energy" and num_speakers == 1:
+        logger.info("Applying energy-based Voice Activity Detection")
+        return assign_single_speaker(result, energy_vad(audio))
+    
+    logger.info("Applying Voice Activity Detection")
+    try:
+        pipeline = load_diarization_model()
+    except Exception as e:
+        if num_speakers != 1:
+            raise
+        # Only this request's VAD depends on the pipeline; a single speaker needs no diarization
+        logger.warning(f"Diarization unavailable ({e}); using the energy VAD for this single-speaker session")
+        return assign_single_speaker(result, energy_vad(audio))
+    with diarize_model_lock:
+        diarize_segments = pipeline(audio, min_speakers=num_speakers, max_speakers=num_speakers)
+    return whisperx.assign_word_speakers(diarize_segments, result)
+
+async def run_asr_pipeline(audio: np.ndarray, language: str, vad_enabled: bool, word_timestamps: bool, num_speakers: int, session_id: str, timings: Dict[str, float]) -> Dict[str, Any]:
+    """Transcribe, align and speaker-label one piece of audio; times are relative to its start"""
+    # Transcribe with specified language, sharing decoder batches with other sessions when enabled
+    with stage_timer(timings, "transcription"):
+        if asr_scheduler:
+            result = await asr_scheduler.transcribe(session_id, audio, language)
+        else:
+            result = await run_inference(transcribe_segments, audio, language)
+    
+    # Align timestamps if word timestamps requested
+    if word_timestamps:
+        logger.info("Aligning word-level timestamps")
+        with stage_timer(timings, "alignment"):
+            result = await run_inference(align_words, result, audio, language)
+    
+    # Apply VAD if enabled (after alignment so words carry speaker labels)
+    if vad_enabled:
+        with stage_timer(timings, "vad"):
+            result = await run_inference(apply_vad, result, audio, num_speakers)
+    
+    return result
+
+def extract_words(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten aligned segments into word entries (words WhisperX could not align are skipped)"""
+    words = []
+    for segment in segments:
+        for word_info in segment.get("words", []):
+            if "start" not in word_info:
+                continue
+            words.append({
+                "word": word_info["word"],
+                "start": word_info["start"],
+                "end": word_info["end"],
+                "confidence": word_info.get("score", 0.0)
+            })
+    return words
+
+def shift_segments(segments: List[Dict[str, Any]], offset: float) -> List[Dict[str, Any]]:
+    """Move chunk-relative segment and word times onto the session timeline"""
+    for segment in segments:
+        for item in [segment] + segment.get("words", []):
+            for key in ("start", "end"):
+                if key in item:
+                    item[key] = round(item[key] + offset, 3)
+    return segments
+
+def build_transcript(segments: List[Dict[str, Any]], language: str, duration: float, word_timestamps: bool) -> Dict[str, Any]:
+    """Assemble the transcript:{session_id} document from aligned segments"""
+    words = extract_words(segments) if word_timestamps else []
+    return {
+        "text": " ".join(segment["text"].strip() for segment in segments),
+        "language": language,
+        "duration": duration,
+        "confidence": 0.0,
+        "words": words,
+        "segments": segments,
+        "filler_words": extract_filler_words(words),
+    }
+
+async def transcribe_audio(audio: np.ndarray, language: str, vad_enabled: bool = True, word_timestamps: bool = True, num_speakers: int = 1, session_id: str = "", timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """Transcribe audio using WhisperX with optional VAD and word timestamps"""
+    timings = timings if timings is not None else {}
     try:
-        # Load audio
-        audio = whisperx.load_audio(audio_path)
-        
-        # Transcribe with specified language
-        result = whisper_model.transcribe(audio, language=language, batch_size=BATCH_SIZE)
+        result = await run_asr_pipeline(audio, language, vad_enabled, word_timestamps, num_speakers, session_id, timings)
+        transcript_data = build_transcript(result.get("segments", []), language, len(audio) / SAMPLE_RATE, word_timestamps)
         
-        # Apply VAD if enabled
-        if vad_enabled:
-            logger.info("Applying Voice Activity Detection")
-            model_a, metadata = whisperx.DiarizationPipeline(use_auth_token=None, device=DEVICE)
-            diarize_segments = model_a(audio, min_speakers=1, max_speakers=1)
-            result = whisperx.assign_word_speakers(diarize_segments, result)
+        logger.info(f"Transcription completed: {len(transcript_data['text'])} characters")
+        return transcript_data
         
-        # Align timestamps if word timestamps requested
-        if word_timestamps:
-            logger.info("Aligning word-level timestamps")
-            model_a, metadata = whisperx.load_align_model(language_code=language, device=DEVICE)
-            result = whisperx.align(result["segments"], model_a, metadata, audio, DEVICE, return_char_alignments=False)
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        raise
+
+async def transcribe_audio_chunked(audio: np.ndarray, language: str, vad_enabled: bool = True, word_timestamps: bool = True, num_speakers: int = 1, session_id: str = "", timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Transcribe chunk by chunk at VAD boundaries, publishing each chunk on asr.partial"""
+    timings = timings if timings is not None else {}
+    try:
+        chunks = chunk_boundaries(audio, ASR_CHUNK_SECONDS)
+        segments: List[Dict[str, Any]] = []
         
-        # Extract word-level information
-        words = []
-        if word_timestamps and "segments" in result:
-            for segment in result["segments"]:
-                if "words" in segment:
-                    for word_info in segment["words"]:
-                        words.append({
-                            "word": word_info["word"],
-                            "start": word_info["start"],
-                            "end": word_info["end"],
-                            "confidence": word_info.get("score", 0.0)
-                        })
+        for index, (start, end) in enumerate(chunks):
+            offset = start / SAMPLE_RATE
+            result = await run_asr_pipeline(audio[start:end], language, vad_enabled, word_timestamps, num_speakers, session_id, timings)
+            chunk_segments = shift_segments(result.get("segments", []), offset)
+            segments.extend(chunk_segments)
+            
+            await publish_partial(session_id, {
+                "chunk_index": index,
+                "chunk_count": len(chunks),
+                "offset": offset,
+                "end": end / SAMPLE_RATE,
+                "language": language,
+                "text": " ".join(segment["text"].strip() for segment in chunk_segments),
+                "words": extract_words(chunk_segments) if word_timestamps else [],
+                "segments": chunk_segments
+            })
         
-        # Prepare response
-        transcript_data = {
-            "text": result["text"],
-            "language": language,
-            "duration": len(audio) / 16000,  # Assuming 16kHz sample rate
-            "confidence": result.get("confidence", 0.0),
-            "words": words,
-            "segments": result.get("segments", []),
-            "filler_words": extract_filler_words(words),
-        }
+        # The final transcript is stitched from the chunks; nothing is re-run
+        transcript_data = build_transcript(segments, language, len(audio) / SAMPLE_RATE, word_timestamps)
         
-        logger.info(f"Transcription completed: {len(transcript_data['text'])} characters")
+        logger.info(f"Chunked transcription completed: {len(chunks)} chunks, {len(transcript_data['text'])} characters")
         return transcript_data
         
     except Exception as e:
-        logger.error(f"Transcription failed: {e}")
+        logger.error(f"Chunked transcription failed: {e}")
         raise
 
 def extract_filler_words(words: list) -> list:
@@ -184,84 +366,107 @@ async def publish_result(session_id: str, result: Dict[str, Any]):
     except Exception as e:
         logger.error(f"Failed to publish ASR result: {e}")
 
-async def process_audio_task(request: AudioProcessingRequest):
+async def publish_partial(session_id: str, partial: Dict[str, Any]):
+    """Publish one chunk's words to NATS as soon as it is transcribed"""
+    try:
+        message = {
+            "session_id": session_id,
+            "type": "asr_partial",
+            "data": partial,
+            "timestamp": asyncio.get_event_loop().time()
+        }
+        
+        await nats_client.publish("asr.partial", json.dumps(message).encode())
+        
+    except Exception as e:
+        logger.error(f"Failed to publish ASR partial result: {e}")
+
+async def update_task_status(task_id: str, session_id: str, status: str, message: str, **extra):
+    """Write the asr_task:{task_id} status document"""
+    await redis_client.set(f"asr_task:{task_id}", json.dumps({
+        "status": status,
+        "session_id": session_id,
+        "message": message,
+        **extra
+    }))
+
+async def process_audio_task(request: AudioProcessingRequest, task_id: str):
     """Background task to process audio transcription"""
-    task_id = str(uuid.uuid4())
+    global active_tasks
+    timings: Dict[str, float] = {}
     
     try:
-        # Update task status
-        await redis_client.set(f"asr_task:{task_id}", json.dumps({
-            "status": "processing",
-            "session_id": request.session_id,
-            "message": "Downloading audio..."
-        }))
-        
-        # Download audio
-        audio_path = await download_audio(request.audio_url)
+        await update_task_status(task_id, request.session_id, "queued", "Waiting for an inference slot...")
         
-        try:
+        async with task_slots:
+            # Update task status
+            await update_task_status(task_id, request.session_id, "processing", "Downloading audio...", timings=timings)
+            
+            # Download and decode through the node-local PCM cache (skipped if a co-located worker already did)
+            with stage_timer(timings, "fetch_audio"):
+                audio, content_key = await audio_cache.fetch(request.audio_url, download_audio)
+            
+            # Short-circuit identical re-submissions to the stored transcript
+            cache_key = transcript_cache_key(content_key, request)
+            cached = await redis_client.get(f"transcript_cache:{cache_key}")
+            if cached:
+                transcript_cache_stats["hits"] += 1
+                result = json.loads(cached)
+                await redis_client.set(f"transcript:{request.session_id}", json.dumps(result))
+                await update_task_status(task_id, request.session_id, "completed", "Transcription served from cache", timings=timings, cached=True, result=result)
+                await publish_result(request.session_id, result)
+                logger.info(f"ASR task served from transcript cache for session: {request.session_id}")
+                return
+            transcript_cache_stats["misses"] += 1
+            
             # Update status
-            await redis_client.set(f"asr_task:{task_id}", json.dumps({
-                "status": "processing",
-                "session_id": request.session_id,
-                "message": "Detecting language..."
-            }))
+            await update_task_status(task_id, request.session_id, "processing", "Detecting language...", timings=timings)
             
             # Detect language if not provided
             language = request.language
             if not language:
-                language = await detect_language(audio_path)
+                with stage_timer(timings, "language_detection"):
+                    language = await detect_language(audio)
             
             # Update status
-            await redis_client.set(f"asr_task:{task_id}", json.dumps({
-                "status": "processing",
-                "session_id": request.session_id,
-                "message": "Transcribing audio..."
-            }))
+            await update_task_status(task_id, request.session_id, "processing", "Transcribing audio...", timings=timings)
             
             # Transcribe audio
-            result = await transcribe_audio(
-                audio_path, 
+            transcribe = transcribe_audio_chunked if request.chunked else transcribe_audio
+            result = await transcribe(
+                audio, 
                 language, 
                 request.vad_enabled, 
-                request.word_timestamps
+                request.word_timestamps,
+                request.num_speakers,
+                request.session_id,
+                timings
             )
             
             # Store result in Redis
             await redis_client.set(f"transcript:{request.session_id}", json.dumps(result))
+            await redis_client.set(f"transcript_cache:{cache_key}", json.dumps(result), ex=TRANSCRIPT_CACHE_TTL)
             
             # Update task status
-            await redis_client.set(f"asr_task:{task_id}", json.dumps({
-                "status": "completed",
-                "session_id": request.session_id,
-                "message": "Transcription completed",
-                "result": result
-            }))
+            await update_task_status(task_id, request.session_id, "completed", "Transcription completed", timings=timings, result=result)
             
             # Publish result to NATS
             await publish_result(request.session_id, result)
             
-            logger.info(f"ASR task completed for session: {request.session_id}")
+            logger.info(f"ASR task completed for session: {request.session_id} (timings: {timings})")
             
-        finally:
-            # Clean up temporary file
-            if os.path.exists(audio_path):
-                os.unlink(audio_path)
-                
     except Exception as e:
         logger.error(f"ASR task failed for session {request.session_id}: {e}")
         
         # Update task status
-        await redis_client.set(f"asr_task:{task_id}", json.dumps({
-            "status": "failed",
-            "session_id": request.session_id,
-            "message": str(e)
-        }))
+        await update_task_status(task_id, request.session_id, "failed", str(e), timings=timings)
+    finally:
+        active_tasks -= 1
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize connections and load model on startup"""
-    global redis_client, nats_client
+    global redis_client, nats_client, align_model_cache, asr_scheduler, inference_executor, audio_cache
     
     # Connect to Redis
     redis_client = redis.from_url(REDIS_URL)
@@ -273,12 +478,42 @@ async def startup_event():
     await nats_client.connect(NATS_URL)
     logger.info("Connected to NATS")
     
+    # Node-local decoded-audio cache shared with the prosody worker
+    audio_cache = SharedAudioCache()
+    
+    # Dedicated pool for blocking torch/CTranslate2 work (both release the GIL during inference)
+    inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="asr-inference")
+    
     # Load WhisperX model
     await load_whisper_model()
+    
+    # Start the cross-session batch scheduler
+    if ASR_BATCHING_ENABLED:
+        asr_scheduler = AsrBatchScheduler(
+            whisper_model, ctranslate2_lock, BATCH_SIZE, ASR_BATCH_MAX_WAIT_MS / 1000, inference_executor, INTER_OP_THREADS,
+        )
+        await asr_scheduler.start()
+    
+    # Warm the alignment model cache
+    align_model_cache = AlignModelCache(DEVICE, ALIGN_MODEL_CACHE_MB * 1024 * 1024)
+    align_model_cache.preload(ALIGN_PRELOAD_LANGUAGES)
+    
+    # Load diarization pipeline unless single-speaker sessions use the energy VAD. A failure
+    # (missing HF_TOKEN, hub outage) must not stop the worker: VAD requests retry the load
+    if VAD_BACKEND != "energy":
+        try:
+            load_diarization_model()
+        except Exception:
+            logger.warning("Starting without the diarization pipeline; it is loaded again on the next VAD request")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown"""
+    await media_fetcher.close()
+    if asr_scheduler:
+        await asr_scheduler.stop()
+    if inference_executor:
+        inference_executor.shutdown(wait=False)
     if redis_client:
         await redis_client.close()
     if nats_client:
@@ -287,17 +522,30 @@ async def shutdown_event():
 @app.post("/process", response_model=AudioProcessingResponse)
 async def process_audio(request: AudioProcessingRequest, background_tasks: BackgroundTasks):
     """Process audio transcription request"""
+    global active_tasks
+    
+    # Admission control: refuse work once running + queued tasks reach capacity
+    if active_tasks >= MAX_CONCURRENT_TASKS + MAX_QUEUED_TASKS:
+        raise HTTPException(
+            status_code=429,
+            detail={"message": "ASR worker is saturated", "queue_position": active_tasks - MAX_CONCURRENT_TASKS + 1},
+            headers={"Retry-After": "30"}
+        )
+    
     try:
         task_id = str(uuid.uuid4())
+        queue_position = max(0, active_tasks - MAX_CONCURRENT_TASKS + 1)
+        active_tasks += 1
         
         # Add task to background processing
-        background_tasks.add_task(process_audio_task, request)
+        background_tasks.add_task(process_audio_task, request, task_id)
         
         return AudioProcessingResponse(
             session_id=request.session_id,
             task_id=task_id,
-            status="accepted",
-            message="Audio processing started"
+            status="accepted" if queue_position == 0 else "queued",
+            message="Audio processing started" if queue_position == 0 else "Audio processing queued",
+            queue_position=queue_position
         )
         
     except Exception as e:
@@ -337,6 +585,24 @@ async def health_check():
         "status": "healthy",
         "model_loaded": whisper_model is not None,
         "device": DEVICE,
+        "compute_type": COMPUTE_TYPE,
+        "vad_backend": VAD_BACKEND,
+        "diarization_loaded": diarize_model is not None,
+        "diarization_error": diarize_load_error,
+        "transcript_cache": {
+            **transcript_cache_stats,
+            "hit_rate": round(transcript_cache_stats["hits"] / max(1, transcript_cache_stats["hits"] + transcript_cache_stats["misses"]), 3)
+        },
+        "inference": {
+            "workers": INFERENCE_WORKERS,
+            "active_tasks": active_tasks,
+            "max_concurrent_tasks": MAX_CONCURRENT_TASKS,
+            "max_queued_tasks": MAX_QUEUED_TASKS
+        },
+        "scheduler": {**asr_scheduler.metrics.to_dict(), "queue_depth": asr_scheduler.queue_depth} if asr_scheduler else None,
+        "align_model_cache": align_model_cache.stats() if align_model_cache else None,
+        "downloads": media_fetcher.metrics(),
+        "audio_cache": audio_cache.stats() if audio_cache else None,
         "redis_connected": redis_client is not None,
         "nats_connected": nats_client is not None
     }
@@ -0,0 +1,132 @@
+"""
+Model Registry - Process-wide caches for WhisperX auxiliary models
+Keeps alignment models resident across requests so word alignment only costs inference time.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+import torch
+import whisperx
+from whisperx.asr import WhisperModel
+
+logger = logging.getLogger(__name__)
+
+# CTranslate2 compute types selectable per device; int8 variants quantize weights for CPU inference
+COMPUTE_TYPES = {
+    "cuda": ("float16", "int8_float16", "int8", "float32"),
+    "cpu": ("float32", "int8", "int8_float32"),
+}
+
+
+def load_whisper_backend(model_size: str, device: str, compute_type: str, intra_op_threads: int, inter_op_threads: int) -> Any:
+    """Build a WhisperX pipeline with an explicit compute type and thread layout
+
+    ``intra_op_threads`` sets CTranslate2 ``cpu_threads`` and torch intra-op threads
+    (used by alignment); ``inter_op_threads`` sets CTranslate2 ``num_workers`` so
+    that many batches can run on the model concurrently.
+    """
+    if compute_type not in COMPUTE_TYPES.get(device, ()):
+        raise ValueError(f"Unsupported compute type {compute_type!r} on {device}")
+
+    if device == "cpu":
+        torch.set_num_threads(intra_op_threads)
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            # Only settable once per process, before any parallel torch work
+            pass
+
+    model = WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=intra_op_threads,
+        num_workers=inter_op_threads,
+    )
+    return whisperx.load_model(model_size, device, compute_type=compute_type, model=model)
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Estimate the resident size of a torch model from its parameters and buffers"""
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class AlignModelCache:
+    """LRU cache of WhisperX alignment models keyed by language code, bounded by a memory budget"""
+
+    def __init__(self, device: str, max_bytes: int):
+        self.device = device
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[str, Tuple[Any, Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(size for _, _, size in self._models.values())
+
+    def get(self, language: str) -> Tuple[Any, Dict[str, Any]]:
+        """Return (model, metadata) for a language, loading it on first use"""
+        with self._lock:
+            entry = self._models.get(language)
+            if entry is not None:
+                self._models.move_to_end(language)
+                self.hits += 1
+                return entry[0], entry[1]
+            load_lock = self._load_locks.setdefault(language, threading.Lock())
+
+        # Load outside the registry lock so hits for other languages are not blocked
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(language)
+                if entry is not None:
+                    self._models.move_to_end(language)
+                    self.hits += 1
+                    return entry[0], entry[1]
+                self.misses += 1
+
+            logger.info(f"Loading alignment model for language: {language}")
+            model, metadata = whisperx.load_align_model(language_code=language, device=self.device)
+            size = estimate_model_bytes(model)
+
+            with self._lock:
+                self._models[language] = (model, metadata, size)
+                self._evict()
+            logger.info(f"Alignment model for {language} loaded ({size / (1024 * 1024):.0f} MB)")
+            return model, metadata
+
+    def preload(self, languages: Iterable[str]):
+        """Load alignment models for the given languages ahead of traffic"""
+        for language in languages:
+            try:
+                self.get(language)
+            except Exception as e:
+                logger.error(f"Failed to preload alignment model for {language}: {e}")
+
+    def _evict(self):
+        """Drop least recently used models until the budget is met (always keeps the newest)"""
+        while len(self._models) > 1 and self.resident_bytes > self.max_bytes:
+            language, _ = self._models.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"Evicted alignment model for language: {language}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "languages": list(self._models.keys()),
+                "resident_mb": round(self.resident_bytes / (1024 * 1024), 1),
+                "budget_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
@@ -0,0 +1,208 @@
+"""
+ASR Scheduler - Cross-session micro-batching for WhisperX inference
+Collects VAD-cut segments from concurrent sessions into shared decoder batches.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, ContextManager, Dict, List, Optional, Set
+
+import numpy as np
+import torch
+from faster_whisper.tokenizer import Tokenizer
+from whisperx.vad import merge_chunks
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 30  # seconds, Whisper's receptive field
+
+
+@dataclass
+class SegmentJob:
+    session_id: str
+    language: str
+    features: Any
+    enqueued_at: float
+    future: asyncio.Future
+
+
+@dataclass
+class SchedulerMetrics:
+    batches: int = 0
+    segments: int = 0
+    fill_ratio_sum: float = 0.0
+    queue_wait_sum: float = 0.0
+    queue_wait_max: float = 0.0
+
+    def record_batch(self, jobs: List[SegmentJob], batch_size: int, now: float):
+        self.batches += 1
+        self.segments += len(jobs)
+        self.fill_ratio_sum += len(jobs) / batch_size
+        for job in jobs:
+            wait = now - job.enqueued_at
+            self.queue_wait_sum += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "segments": self.segments,
+            "avg_batch_fill_ratio": round(self.fill_ratio_sum / self.batches, 3) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(1000 * self.queue_wait_sum / self.segments, 1) if self.segments else 0.0,
+            "max_queue_wait_ms": round(1000 * self.queue_wait_max, 1),
+        }
+
+
+class AsrBatchScheduler:
+    """Micro-batches decoder work across sessions with a max-wait deadline
+
+    Each session is VAD-cut into <=30s segments whose log-mel features are queued
+    in order. A single dispatcher drains the queue into batches of up to
+    ``batch_size`` (or whatever has arrived when the oldest segment hits
+    ``max_wait``), groups them by language and runs one decoder call per group.
+    Up to ``max_inflight`` batches decode at once (CTranslate2 ``num_workers``);
+    the next batch is only collected once a slot is free, so batches still fill
+    while the decoder is busy. Results are reassembled per session in segment order.
+    """
+
+    def __init__(self, model: Any, model_lock: ContextManager, batch_size: int, max_wait: float,
+                 executor: Optional[Executor] = None, max_inflight: int = 1):
+        self.model = model
+        self.model_lock = model_lock
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.max_inflight = max(1, max_inflight)
+        self.metrics = SchedulerMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._decodes: Set[asyncio.Task] = set()
+        self._tokenizers: Dict[str, Tokenizer] = {}
+        self._tokenizers_lock = threading.Lock()
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"ASR scheduler started (batch_size={self.batch_size}, max_wait={self.max_wait * 1000:.0f}ms, "
+                    f"{self.max_inflight} batch(es) in flight)")
+
+    async def stop(self):
+        tasks = [self._dispatcher, *self._decodes] if self._dispatcher else list(self._decodes)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def transcribe(self, session_id: str, audio: np.ndarray, language: str) -> Dict[str, Any]:
+        """Transcribe one session's audio through the shared batch queue"""
+        loop = asyncio.get_running_loop()
+        vad_segments, features = await loop.run_in_executor(self.executor, self._prepare, audio)
+
+        futures = []
+        for feature in features:
+            future = loop.create_future()
+            self._queue.put_nowait(SegmentJob(session_id, language, feature, time.monotonic(), future))
+            futures.append(future)
+
+        # gather preserves submission order, so segments come back in time order
+        texts = await asyncio.gather(*futures)
+        segments = [
+            {"text": text, "start": round(seg["start"], 3), "end": round(seg["end"], 3)}
+            for seg, text in zip(vad_segments, texts)
+        ]
+        return {"segments": segments, "language": language}
+
+    def _prepare(self, audio: np.ndarray):
+        """VAD-cut audio the same way WhisperX does and compute log-mel features per segment"""
+        vad_segments = self.model.vad_model({"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE})
+        vad_segments = merge_chunks(
+            vad_segments,
+            CHUNK_SIZE,
+            onset=self.model._vad_params["vad_onset"],
+            offset=self.model._vad_params["vad_offset"],
+        )
+        features = [
+            self.model.preprocess({"inputs": audio[int(seg["start"] * SAMPLE_RATE):int(seg["end"] * SAMPLE_RATE)]})["inputs"]
+            for seg in vad_segments
+        ]
+        return vad_segments, features
+
+    async def _dispatch_loop(self):
+        while True:
+            # Wait for a free decode slot before collecting, so a batch keeps filling while all slots are busy
+            await self._inflight.acquire()
+            try:
+                first = await self._queue.get()
+            except BaseException:
+                self._inflight.release()
+                raise
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    # Past the deadline: still take whatever queued up while the slots were busy
+                    while len(batch) < self.batch_size and not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.metrics.record_batch(batch, self.batch_size, time.monotonic())
+
+            groups: Dict[str, List[SegmentJob]] = {}
+            for job in batch:
+                groups.setdefault(job.language, []).append(job)
+
+            task = asyncio.create_task(self._decode_groups(groups))
+            self._decodes.add(task)
+            task.add_done_callback(self._decodes.discard)
+
+    async def _decode_groups(self, groups: Dict[str, List[SegmentJob]]):
+        """Decode one batch, one call per language, then free its slot"""
+        loop = asyncio.get_running_loop()
+        try:
+            for language, jobs in groups.items():
+                try:
+                    texts = await loop.run_in_executor(self.executor, self._decode, [job.features for job in jobs], language)
+                except Exception as e:
+                    logger.error(f"Batched decode failed for {len(jobs)} segments: {e}")
+                    for job in jobs:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                    continue
+                for job, text in zip(jobs, texts):
+                    if not job.future.done():
+                        job.future.set_result(text)
+        finally:
+            self._inflight.release()
+
+    def _decode(self, features: List[Any], language: str) -> List[str]:
+        batch = np.stack([np.asarray(feature) for feature in features])
+        with self.model_lock:
+            return self.model.model.generate_segment_batched(batch, self._tokenizer(language), self.model.options)
+
+    def _tokenizer(self, language: str) -> Tokenizer:
+        # Decodes for different batches may run on several executor threads
+        with self._tokenizers_lock:
+            if language not in self._tokenizers:
+                self._tokenizers[language] = Tokenizer(
+                    self.model.model.hf_tokenizer,
+                    self.model.model.model.is_multilingual,
+                    task="transcribe",
+                    language=language,
+                )
+            return self._tokenizers[language]
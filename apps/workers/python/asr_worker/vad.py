@@ -0,0 +1,93 @@
+"""
+Energy VAD - Lightweight voice activity detection for single-speaker sessions
+Uses the same framed-RMS / percentile threshold as the prosody worker's pause analysis.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from workers.runs import mask_runs
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 0.025  # 25ms frames
+HOP_LENGTH = 0.010    # 10ms hop
+SILENCE_PERCENTILE = 20
+MIN_SPEECH_DURATION = 0.25
+MIN_SILENCE_DURATION = 0.3
+
+
+def frame_rms(audio: np.ndarray, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Frame-level RMS energy with centered 25ms frames at a 10ms hop"""
+    frame_length = int(FRAME_LENGTH * sr)
+    hop_length = int(HOP_LENGTH * sr)
+    padded = np.pad(audio.astype(np.float32, copy=False), frame_length // 2, mode="constant")
+    n_frames = 1 + max(0, len(padded) - frame_length) // hop_length
+    frames = np.lib.stride_tricks.as_strided(
+        padded,
+        shape=(n_frames, frame_length),
+        strides=(padded.strides[0] * hop_length, padded.strides[0]),
+        writeable=False,
+    )
+    return np.sqrt(np.mean(np.square(frames), axis=1))
+
+
+def energy_vad(audio: np.ndarray, sr: int = SAMPLE_RATE) -> List[Dict[str, float]]:
+    """Return speech regions as [{"start", "end"}] in seconds"""
+    if len(audio) == 0:
+        return []
+
+    rms = frame_rms(audio, sr)
+    threshold = np.percentile(rms, SILENCE_PERCENTILE)
+    speech_mask = rms >= threshold
+
+    # Bridge short silences so words inside a phrase stay in one region
+    silence_starts, silence_ends = mask_runs(~speech_mask)
+    short = (silence_ends - silence_starts) * HOP_LENGTH < MIN_SILENCE_DURATION
+    for start, end in zip(silence_starts[short], silence_ends[short]):
+        speech_mask[start:end] = True
+
+    starts, ends = mask_runs(speech_mask)
+    keep = (ends - starts) * HOP_LENGTH >= MIN_SPEECH_DURATION
+    duration = len(audio) / sr
+    return [
+        {"start": float(start * HOP_LENGTH), "end": float(min(end * HOP_LENGTH, duration))}
+        for start, end in zip(starts[keep], ends[keep])
+    ]
+
+
+def assign_single_speaker(result: Dict[str, Any], speech_regions: List[Dict[str, float]], speaker: str = "SPEAKER_00") -> Dict[str, Any]:
+    """Label segments and words with one speaker, dropping segments that lie entirely in silence"""
+    if not speech_regions:
+        return result
+
+    region_starts = np.array([r["start"] for r in speech_regions])
+    region_ends = np.array([r["end"] for r in speech_regions])
+
+    segments = []
+    for segment in result.get("segments", []):
+        overlaps = (region_starts < segment["end"]) & (region_ends > segment["start"])
+        if not overlaps.any():
+            continue
+        segment["speaker"] = speaker
+        for word_info in segment.get("words", []):
+            word_info["speaker"] = speaker
+        segments.append(segment)
+
+    result["segments"] = segments
+    return result
+
+
+def chunk_boundaries(audio: np.ndarray, target_seconds: float, sr: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """Split audio into ~target_seconds chunks, cutting only in the middle of silences"""
+    regions = energy_vad(audio, sr)
+    duration = len(audio) / sr
+    chunks = []
+    chunk_start = 0.0
+    for current, following in zip(regions, regions[1:]):
+        cut = (current["end"] + following["start"]) / 2
+        if cut - chunk_start >= target_seconds:
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    chunks.append((chunk_start, duration))
+    return [(int(start * sr), int(end * sr)) for start, end in chunks if end > start]
@@ -19,6 +19,8 @@ from pydantic import BaseModel
 import redis.asyncio as redis
 from nats.aio.client import Client as NATS
 
+from workers.fetch import media_fetcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -56,23 +58,9 @@ class ClipResponse(BaseModel):
 
 async def download_video(video_url: str) -> str:
     """Download video file from URL to temporary file"""
-    import requests
-    
     try:
-        response = requests.get(video_url, stream=True)
-        response.raise_for_status()
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-        temp_path = temp_file.name
-        temp_file.close()
-        
-        # Write video data
-        with open(temp_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        logger.info(f"Downloaded video to: {temp_path}")
+        temp_path, stats = await media_fetcher.fetch_to_tempfile(video_url, suffix=".mp4")
+        logger.info(f"Downloaded video to: {temp_path} ({stats.megabytes_per_second:.1f} MB/s)")
         return temp_path
     except Exception as e:
         logger.error(f"Failed to download video: {e}")
@@ -468,6 +456,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown"""
+    await media_fetcher.close()
     if redis_client:
         await redis_client.close()
     if nats_client:
@@ -525,6 +514,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
+        "downloads": media_fetcher.metrics(),
         "redis_connected": redis_client is not None,
         "nats_connected": nats_client is not None,
         "ffmpeg_available": True  # Simplified check
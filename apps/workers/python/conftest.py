@@ -0,0 +1 @@
+"""Puts apps/workers/python on sys.path so worker modules can import the shared workers package under pytest"""
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Fluency Benchmark - Cost of the fluency pipeline per 1k transcript words
+Times the shared single parse (NER and lemmatizer disabled) against the
+previous two full-pipeline parses per session, then each analyzer over the
+shared context. With --grammar, the sentence-level LanguageTool check is timed
+cold (first run) and again once every sentence is in the LRU.
+
+    python benchmark.py
+    python benchmark.py --words 1000 10000 --grammar
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+import spacy
+
+import main
+from context import DISABLED_COMPONENTS, FluencyContext
+
+MODEL = "en_core_web_sm"
+WORD_COUNTS = (1000, 5000, 20000)
+
+SENTENCES = [
+    "So I think the main point of the quarterly review is that revenue grew faster than we expected",
+    "Um we had some issues with the rollout in the first two weeks",
+    "Basically the team worked really hard to fix the onboarding flow for new customers",
+    "I mean the numbers speak for themselves you know",
+    "Our next step is to focus on retention and to reduce churn in the enterprise segment",
+    "Well the the support queue is still longer than we would like",
+    "Actually let me rephrase that we are hiring two more engineers for the platform team",
+    "The results of the survey were shared with everyone at",
+]
+
+
+def best_of(func: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def synthetic_transcript(n_words: int, seed: int = 0) -> Dict[str, object]:
+    """Speech-like transcript text plus evenly timed ASR words"""
+    rng = random.Random(seed)
+    sentences, count = [], 0
+    while count < n_words:
+        sentence = rng.choice(SENTENCES)
+        sentences.append(sentence + ".")
+        count += len(sentence.split())
+    text = " ".join(sentences)
+    words = [
+        {"word": word.strip(".").lower(), "start": i * 0.4, "end": i * 0.4 + 0.3, "confidence": 0.9}
+        for i, word in enumerate(text.split())
+    ]
+    return {"text": text, "words": words}
+
+
+def per_1k(seconds: float, n_words: int) -> float:
+    return round(seconds * 1000 / n_words * 1000, 2)
+
+
+def bench_parse(full_nlp, shared_nlp, word_counts: List[int], repeats: int) -> List[Dict[str, object]]:
+    rows = []
+    for n_words in word_counts:
+        text = synthetic_transcript(n_words)["text"]
+        # Previous behaviour: vocabulary and complexity each parsed the text with the full pipeline
+        legacy = best_of(lambda: (full_nlp(text), full_nlp(text)), repeats)
+        shared = best_of(lambda: shared_nlp(text), repeats)
+        rows.append({
+            "words": n_words,
+            "two_full_parses_ms_per_1k": per_1k(legacy, n_words),
+            "one_shared_parse_ms_per_1k": per_1k(shared, n_words),
+            "speedup": round(legacy / shared, 2),
+        })
+    return rows
+
+
+async def bench_grammar(ctx: FluencyContext, timings: Dict[str, float]):
+    """Cold check, then the same transcript again with every sentence cached"""
+    for stage in ("grammar_errors", "grammar_errors_cached"):
+        started = time.perf_counter()
+        await main.analyze_grammar(ctx)
+        timings[stage] = time.perf_counter() - started
+
+
+def bench_analyzers(shared_nlp, word_counts: List[int], repeats: int, grammar: bool = False) -> List[Dict[str, object]]:
+    rows = []
+    for n_words in word_counts:
+        transcript = synthetic_transcript(n_words)
+        timings: Dict[str, float] = {}
+        for _ in range(repeats):
+            ctx = FluencyContext.parse(shared_nlp, transcript["text"], transcript["words"])
+            main.run_analyzers(ctx)
+            for stage, seconds in ctx.timings.items():
+                timings[stage] = min(timings.get(stage, float("inf")), seconds)
+        if grammar:
+            # Fresh checker per size so the cold run really misses the cache
+            main.load_language_tool()
+            asyncio.run(bench_grammar(ctx, timings))
+            main.grammar_checker.pool.close()
+        rows.append({
+            "words": n_words,
+            "ms_per_1k_words": {stage: per_1k(seconds, n_words) for stage, seconds in timings.items()},
+            "total_ms_per_1k_words": per_1k(sum(seconds for stage, seconds in timings.items() if stage != "grammar_errors_cached"), n_words),
+        })
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=list(WORD_COUNTS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--grammar", action="store_true", help="include LanguageTool (starts the local server pool)")
+    args = parser.parse_args()
+
+    full_nlp = spacy.load(MODEL)
+    shared_nlp = spacy.load(MODEL, disable=DISABLED_COMPONENTS)
+    main.nlp = shared_nlp
+
+    print(json.dumps({
+        "parse": bench_parse(full_nlp, shared_nlp, args.words, args.repeats),
+        "analyzers": bench_analyzers(shared_nlp, args.words, args.repeats, args.grammar),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,63 @@
+"""
+Fluency Context - Parse-once shared text features for fluency analysis
+Holds the transcript, its timed words and a single spaCy Doc that every analyzer
+reads from, and times each stage.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pipeline components no fluency analyzer reads; sentence boundaries come from the parser
+DISABLED_COMPONENTS = ("ner", "lemmatizer")
+SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]*")
+
+
+class FluencyContext:
+    """Transcript text, ASR words and the shared spaCy Doc (None when no model is loaded)"""
+
+    def __init__(self, text: str, words: Optional[List[Dict[str, Any]]] = None, doc=None):
+        self.text = text
+        self.words = words or []
+        self.doc = doc
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = round(self.timings.get(stage, 0.0) + time.perf_counter() - started, 4)
+
+    @classmethod
+    def parse(cls, nlp, text: str, words: Optional[List[Dict[str, Any]]] = None) -> "FluencyContext":
+        ctx = cls(text, words)
+        if nlp is not None:
+            with ctx.timed("parse"):
+                ctx.doc = nlp(text)
+        return ctx
+
+    @cached_property
+    def lower_text(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Sentence texts without terminal punctuation; falls back to splitting on '.' without a Doc"""
+        if self.doc is None:
+            return [sentence.strip() for sentence in self.text.split(".")]
+        return [sentence.text.strip().rstrip(".!?").strip() for sentence in self.doc.sents]
+
+    @cached_property
+    def sentence_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) character offsets of each sentence in the text"""
+        if self.doc is None:
+            return [match.span() for match in SENTENCE_PATTERN.finditer(self.text)]
+        return [(sentence.start_char, sentence.end_char) for sentence in self.doc.sents]
@@ -0,0 +1,187 @@
+"""
+Grammar Checking - Sentence-level LanguageTool checks over a server pool
+The transcript is split into sentences; each distinct sentence is checked once,
+fanned out across a pool of local LanguageTool servers, and its matches are
+memoized by normalized-sentence hash in an in-process LRU backed by Redis.
+Match offsets are stored relative to the normalized sentence and mapped back
+to the full transcript on the way out.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from language_tool_python import LanguageTool
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "grammar:v1"
+MAX_REPLACEMENTS = 3
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sentence(text: str) -> Tuple[str, List[int]]:
+    """Trimmed sentence with whitespace runs collapsed, plus the source offset of every normalized character"""
+    normalized, offsets = [], []
+    for match in re.finditer(r"\S+", text):
+        if normalized:
+            normalized.append(" ")
+            offsets.append(match.start() - 1)
+        normalized.append(match.group())
+        offsets.extend(range(match.start(), match.end()))
+    return "".join(normalized), offsets
+
+
+def sentence_key(language: str, normalized: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{language}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+
+
+def match_to_dict(match) -> Dict[str, Any]:
+    return {
+        "type": match.ruleId,
+        "message": match.message,
+        "context": match.context,
+        "offset": match.offset,
+        "error_length": match.errorLength,
+        "replacements": match.replacements[:MAX_REPLACEMENTS] if match.replacements else []
+    }
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used key"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.items: OrderedDict = OrderedDict()
+
+    def get(self, key: str):
+        if key not in self.items:
+            return None
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key: str, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class LanguageToolPool:
+    """Fixed set of LanguageTool instances, each with its own local server"""
+
+    def __init__(self, size: int, language: str = "en-US"):
+        self.language = language
+        self.tools = [LanguageTool(language) for _ in range(size)]
+        self.idle: asyncio.Queue = asyncio.Queue()
+        for tool in self.tools:
+            self.idle.put_nowait(tool)
+        self.checks = 0
+
+    async def check(self, text: str) -> List[Dict[str, Any]]:
+        """Matches for one text from the next idle server"""
+        tool = await self.idle.get()
+        try:
+            matches = await asyncio.to_thread(tool.check, text)
+        finally:
+            self.idle.put_nowait(tool)
+        self.checks += 1
+        return [match_to_dict(match) for match in matches]
+
+    def close(self):
+        for tool in self.tools:
+            tool.close()
+
+    def stats(self):
+        return {"size": len(self.tools), "idle": self.idle.qsize(), "checks": self.checks}
+
+
+class GrammarChecker:
+    """Sentence-level checks through the LRU, Redis and the LanguageTool pool"""
+
+    def __init__(self, pool: LanguageToolPool, redis_client=None, lru_size: int = 10000, ttl: int = 7 * 24 * 3600):
+        self.pool = pool
+        self.redis = redis_client
+        self.lru = LRUCache(lru_size)
+        self.ttl = ttl
+        self.lru_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def _lookup_redis(self, keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        if not self.redis or not keys:
+            return {}
+        try:
+            values = await self.redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Grammar cache lookup failed: {e}")
+            return {}
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def _store_redis(self, entries: Dict[str, List[Dict[str, Any]]]):
+        if not self.redis or not entries:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, matches in entries.items():
+                    pipe.set(key, json.dumps(matches), ex=self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Grammar cache write failed: {e}")
+
+    async def check(self, text: str, spans: Sequence[Tuple[int, int]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Matches for ``text`` checked sentence by sentence; returns (matches, sentences served from cache)"""
+        sentences = []
+        for start, end in spans:
+            normalized, offsets = normalize_sentence(text[start:end])
+            if normalized:
+                sentences.append((start, normalized, offsets, sentence_key(self.pool.language, normalized)))
+
+        # Each distinct sentence is resolved once: LRU, then Redis, then a LanguageTool server
+        results = {}
+        for _, normalized, _, key in sentences:
+            cached = self.lru.get(key)
+            if cached is not None:
+                results[key] = cached
+        lru_hits = len(results)
+
+        pending = {key: normalized for _, normalized, _, key in sentences if key not in results}
+        from_redis = await self._lookup_redis(list(pending))
+        results.update(from_redis)
+
+        to_check = {key: normalized for key, normalized in pending.items() if key not in from_redis}
+        checked = await asyncio.gather(*(self.pool.check(normalized) for normalized in to_check.values()))
+        fresh = dict(zip(to_check, checked))
+        results.update(fresh)
+        await self._store_redis(fresh)
+
+        for key in pending:
+            self.lru.put(key, results[key])
+        self.lru_hits += lru_hits
+        self.redis_hits += len(from_redis)
+        self.misses += len(fresh)
+
+        # Map sentence-relative offsets back onto the transcript
+        matches = []
+        for start, normalized, offsets, key in sentences:
+            for match in results[key]:
+                first = offsets[min(match["offset"], len(offsets) - 1)]
+                last = offsets[min(match["offset"] + max(match["error_length"], 1), len(offsets)) - 1]
+                matches.append({**match, "offset": start + first, "error_length": last - first + 1 if match["error_length"] else 0})
+        return matches, len(sentences) - len(fresh)
+
+    def stats(self):
+        return {
+            "pool": self.pool.stats(),
+            "lru_size": len(self.lru),
+            "lru_hits": self.lru_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
@@ -9,16 +9,19 @@ import json
 import logging
 import os
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional
 import uuid
 
 import spacy
-from language_tool_python import LanguageTool
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 import redis.asyncio as redis
 from nats.aio.client import Client as NATS
 
+from context import DISABLED_COMPONENTS, FluencyContext
+from grammar import GrammarChecker, LanguageToolPool
+from nlp_batcher import NlpBatcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,12 +32,20 @@ app = FastAPI(title="Fluency Worker", version="1.0.0")
 # Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 NATS_URL = os.getenv("NATS_URL", "nats://localhost:4222")
+NLP_MAX_BATCH = int(os.getenv("NLP_MAX_BATCH", "32"))  # transcripts per nlp.pipe call
+NLP_MAX_WAIT_MS = float(os.getenv("NLP_MAX_WAIT_MS", "20"))  # longest a transcript waits for batch-mates
+NLP_PIPE_BATCH_SIZE = int(os.getenv("NLP_PIPE_BATCH_SIZE", "16"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+LANGUAGETOOL_POOL_SIZE = int(os.getenv("LANGUAGETOOL_POOL_SIZE", "2"))  # local LanguageTool servers (one JVM each)
+GRAMMAR_LRU_SIZE = int(os.getenv("GRAMMAR_LRU_SIZE", "10000"))  # sentences memoized in process
+GRAMMAR_CACHE_TTL = int(os.getenv("GRAMMAR_CACHE_TTL", str(7 * 24 * 3600)))  # seconds sentences stay in Redis
 
 # Global variables
 redis_client: Optional[redis.Redis] = None
 nats_client: Optional[NATS] = None
 nlp = None
-language_tool = None
+nlp_batcher: Optional[NlpBatcher] = None
+grammar_checker: Optional[GrammarChecker] = None
 
 class FluencyAnalysisRequest(BaseModel):
     session_id: str
@@ -52,28 +63,30 @@ def load_nlp_model(language: str = "en"):
     global nlp
     try:
         if language == "en":
-            nlp = spacy.load("en_core_web_sm")
+            nlp = spacy.load("en_core_web_sm", disable=DISABLED_COMPONENTS)
         else:
             # Default to English if language not supported
-            nlp = spacy.load("en_core_web_sm")
-        logger.info(f"Loaded spaCy model for language: {language}")
+            nlp = spacy.load("en_core_web_sm", disable=DISABLED_COMPONENTS)
+        logger.info(f"Loaded spaCy model for language: {language} (pipeline: {', '.join(nlp.pipe_names)})")
     except OSError:
         logger.warning("spaCy model not found, downloading...")
         spacy.cli.download("en_core_web_sm")
-        nlp = spacy.load("en_core_web_sm")
+        nlp = spacy.load("en_core_web_sm", disable=DISABLED_COMPONENTS)
 
 def load_language_tool():
-    """Load LanguageTool for grammar checking"""
-    global language_tool
+    """Start the LanguageTool server pool for grammar checking"""
+    global grammar_checker
     try:
-        language_tool = LanguageTool('en-US')
-        logger.info("Loaded LanguageTool")
+        pool = LanguageToolPool(LANGUAGETOOL_POOL_SIZE, 'en-US')
+        grammar_checker = GrammarChecker(pool, redis_client, GRAMMAR_LRU_SIZE, GRAMMAR_CACHE_TTL)
+        logger.info(f"Loaded LanguageTool pool of {LANGUAGETOOL_POOL_SIZE}")
     except Exception as e:
         logger.error(f"Failed to load LanguageTool: {e}")
-        language_tool = None
+        grammar_checker = None
 
-def detect_filler_words(text: str, words: List[Dict[str, Any]]) -> Dict[str, Any]:
+def detect_filler_words(ctx: FluencyContext) -> Dict[str, Any]:
     """Detect filler words in speech"""
+    words = ctx.words
     # Common filler words and phrases
     filler_patterns = [
         r'\b(um|uh|ah|er|erm)\b',
@@ -88,7 +101,7 @@ def detect_filler_words(text: str, words: List[Dict[str, Any]]) -> Dict[str, Any
     
     # Find filler words in text
     for pattern in filler_patterns:
-        matches = re.finditer(pattern, text.lower())
+        matches = re.finditer(pattern, ctx.lower_text)
         for match in matches:
             filler_word = match.group()
             start_pos = match.start()
@@ -112,7 +125,7 @@ def detect_filler_words(text: str, words: List[Dict[str, Any]]) -> Dict[str, Any
     
     filler_stats = {
         "filler_word_count": len(filler_words),
-        "filler_word_rate": len(filler_words) / len(text.split()) if text.split() else 0,
+        "filler_word_rate": len(filler_words) / ctx.word_count if ctx.word_count else 0,
         "filler_words": filler_words,
         "filler_positions": filler_with_timestamps
     }
@@ -120,26 +133,14 @@ def detect_filler_words(text: str, words: List[Dict[str, Any]]) -> Dict[str, Any
     logger.info(f"Detected {len(filler_words)} filler words")
     return filler_stats
 
-def analyze_grammar(text: str) -> Dict[str, Any]:
+async def analyze_grammar(ctx: FluencyContext) -> Dict[str, Any]:
     """Analyze grammar errors using LanguageTool"""
-    if not language_tool:
+    if not grammar_checker:
         return {"grammar_errors": [], "error_count": 0}
     
     try:
-        # Check grammar
-        matches = language_tool.check(text)
-        
-        grammar_errors = []
-        for match in matches:
-            error_info = {
-                "type": match.ruleId,
-                "message": match.message,
-                "context": match.context,
-                "offset": match.offset,
-                "error_length": match.errorLength,
-                "replacements": match.replacements[:3] if match.replacements else []
-            }
-            grammar_errors.append(error_info)
+        # Check grammar sentence by sentence; repeated sentences come from the cache
+        grammar_errors, cached_sentences = await grammar_checker.check(ctx.text, ctx.sentence_spans)
         
         # Group errors by type
         error_types = {}
@@ -153,27 +154,26 @@ def analyze_grammar(text: str) -> Dict[str, Any]:
             "grammar_errors": grammar_errors,
             "error_count": len(grammar_errors),
             "error_types": error_types,
-            "error_rate": len(grammar_errors) / len(text.split()) if text.split() else 0
+            "error_rate": len(grammar_errors) / ctx.word_count if ctx.word_count else 0,
+            "sentences_checked": len(ctx.sentence_spans),
+            "sentences_cached": cached_sentences
         }
         
-        logger.info(f"Found {len(grammar_errors)} grammar errors")
+        logger.info(f"Found {len(grammar_errors)} grammar errors ({cached_sentences}/{len(ctx.sentence_spans)} sentences cached)")
         return grammar_stats
         
     except Exception as e:
         logger.error(f"Grammar analysis failed: {e}")
         return {"grammar_errors": [], "error_count": 0}
 
-def analyze_vocabulary_diversity(text: str) -> Dict[str, Any]:
+def analyze_vocabulary_diversity(ctx: FluencyContext) -> Dict[str, Any]:
     """Analyze vocabulary diversity using Type-Token Ratio (TTR)"""
-    if not nlp:
+    if ctx.doc is None:
         return {"type_token_ratio": 0.0, "unique_words": 0, "total_words": 0}
     
     try:
-        # Process text with spaCy
-        doc = nlp(text)
-        
-        # Get tokens (words)
-        tokens = [token.text.lower() for token in doc if token.is_alpha and not token.is_stop]
+        # Get tokens (words) from the shared parse
+        tokens = [token.lower_ for token in ctx.doc if token.is_alpha and not token.is_stop]
         
         # Calculate TTR
         unique_words = len(set(tokens))
@@ -204,17 +204,14 @@ def analyze_vocabulary_diversity(text: str) -> Dict[str, Any]:
         logger.error(f"Vocabulary analysis failed: {e}")
         return {"type_token_ratio": 0.0, "unique_words": 0, "total_words": 0}
 
-def analyze_sentence_complexity(text: str) -> Dict[str, Any]:
+def analyze_sentence_complexity(ctx: FluencyContext) -> Dict[str, Any]:
     """Analyze sentence complexity"""
-    if not nlp:
+    if ctx.doc is None:
         return {"average_length": 0, "complex_sentences": 0, "simple_sentences": 0}
     
     try:
-        # Process text with spaCy
-        doc = nlp(text)
-        
-        # Get sentences
-        sentences = list(doc.sents)
+        # Get sentences from the shared parse
+        sentences = list(ctx.doc.sents)
         
         sentence_lengths = []
         complex_sentences = 0
@@ -249,7 +246,7 @@ def analyze_sentence_complexity(text: str) -> Dict[str, Any]:
         logger.error(f"Sentence complexity analysis failed: {e}")
         return {"average_length": 0, "complex_sentences": 0, "simple_sentences": 0}
 
-def analyze_speech_patterns(text: str, words: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_speech_patterns(ctx: FluencyContext) -> Dict[str, Any]:
     """Analyze speech patterns and disfluencies"""
     patterns = {
         "repetitions": 0,
@@ -259,7 +256,7 @@ def analyze_speech_patterns(text: str, words: List[Dict[str, Any]]) -> Dict[str,
     }
     
     # Detect repetitions
-    word_list = [word_info["word"].lower() for word_info in words]
+    word_list = [word_info["word"].lower() for word_info in ctx.words]
     for i in range(len(word_list) - 1):
         if word_list[i] == word_list[i + 1]:
             patterns["repetitions"] += 1
@@ -267,20 +264,34 @@ def analyze_speech_patterns(text: str, words: List[Dict[str, Any]]) -> Dict[str,
     # Detect self-corrections (simplified)
     correction_indicators = ["i mean", "that is", "actually", "let me rephrase"]
     for indicator in correction_indicators:
-        if indicator in text.lower():
+        if indicator in ctx.lower_text:
             patterns["self_corrections"] += 1
     
     # Detect incomplete sentences (ending with prepositions, etc.)
     incomplete_endings = ["of", "in", "at", "to", "for", "with", "by"]
-    sentences = text.split('.')
-    for sentence in sentences:
-        sentence = sentence.strip()
+    for sentence in ctx.sentences:
         if sentence and any(sentence.lower().endswith(f" {ending}") for ending in incomplete_endings):
             patterns["incomplete_sentences"] += 1
     
     logger.info(f"Speech patterns: repetitions={patterns['repetitions']}, corrections={patterns['self_corrections']}")
     return patterns
 
+# Analyzers run over one shared FluencyContext, in this order; grammar runs alongside them on the LanguageTool pool
+FLUENCY_ANALYZERS = {
+    "filler_words": detect_filler_words,
+    "vocabulary_diversity": analyze_vocabulary_diversity,
+    "sentence_complexity": analyze_sentence_complexity,
+    "speech_patterns": analyze_speech_patterns,
+}
+
+def run_analyzers(ctx: FluencyContext) -> Dict[str, Any]:
+    """Run every fluency analyzer against the shared context, timing each one"""
+    results = {}
+    for name, analyzer in FLUENCY_ANALYZERS.items():
+        with ctx.timed(name):
+            results[name] = analyzer(ctx)
+    return results
+
 async def analyze_fluency(transcript_data: Dict[str, Any], language: str = "en") -> Dict[str, Any]:
     """Perform comprehensive fluency analysis"""
     try:
@@ -290,27 +301,30 @@ async def analyze_fluency(transcript_data: Dict[str, Any], language: str = "en")
         if not text:
             return {"error": "No transcript text provided"}
         
-        # Perform all analyses
-        filler_stats = detect_filler_words(text, words)
-        grammar_stats = analyze_grammar(text)
-        vocabulary_stats = analyze_vocabulary_diversity(text)
-        complexity_stats = analyze_sentence_complexity(text)
-        pattern_stats = analyze_speech_patterns(text, words)
+        # Parse once, batched with concurrent jobs; every analyzer reads the same Doc
+        ctx = FluencyContext(text, words)
+        if nlp_batcher:
+            with ctx.timed("parse"):
+                ctx.doc = await nlp_batcher.parse(text)
+        async def timed_grammar():
+            with ctx.timed("grammar_errors"):
+                return await analyze_grammar(ctx)
+        
+        results, grammar_stats = await asyncio.gather(asyncio.to_thread(run_analyzers, ctx), timed_grammar())
+        results["grammar_errors"] = grammar_stats
         
         # Combine all results
         fluency_data = {
-            "filler_words": filler_stats,
-            "grammar_errors": grammar_stats,
-            "vocabulary_diversity": vocabulary_stats,
-            "sentence_complexity": complexity_stats,
-            "speech_patterns": pattern_stats,
+            **results,
             "overall_fluency_score": calculate_fluency_score(
-                filler_stats, grammar_stats, vocabulary_stats, complexity_stats, pattern_stats
+                results["filler_words"], results["grammar_errors"], results["vocabulary_diversity"],
+                results["sentence_complexity"], results["speech_patterns"]
             ),
+            "timings": ctx.timings,
             "analysis_timestamp": asyncio.get_event_loop().time()
         }
         
-        logger.info("Fluency analysis completed successfully")
+        logger.info(f"Fluency analysis completed successfully ({ctx.word_count} words, timings: {ctx.timings})")
         return fluency_data
         
     except Exception as e:
@@ -410,7 +424,7 @@ async def process_fluency_task(request: FluencyAnalysisRequest):
 @app.on_event("startup")
 async def startup_event():
     """Initialize connections and models on startup"""
-    global redis_client, nats_client
+    global redis_client, nats_client, nlp_batcher
     
     # Connect to Redis
     redis_client = redis.from_url(REDIS_URL)
@@ -425,10 +439,20 @@ async def startup_event():
     # Load NLP models
     load_nlp_model()
     load_language_tool()
+    
+    # Concurrent jobs share nlp.pipe batches
+    if nlp is not None:
+        nlp_batcher = NlpBatcher(nlp, NLP_MAX_BATCH, NLP_MAX_WAIT_MS / 1000, NLP_PIPE_BATCH_SIZE, NLP_N_PROCESS)
+        nlp_batcher.start()
+        logger.info(f"spaCy batching: up to {NLP_MAX_BATCH} transcripts, {NLP_MAX_WAIT_MS:g}ms max wait, {NLP_N_PROCESS} process(es)")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown"""
+    if nlp_batcher:
+        await nlp_batcher.close()
+    if grammar_checker:
+        grammar_checker.pool.close()
     if redis_client:
         await redis_client.close()
     if nats_client:
@@ -486,7 +510,9 @@ async def health_check():
     return {
         "status": "healthy",
         "spacy_loaded": nlp is not None,
-        "language_tool_loaded": language_tool is not None,
+        "nlp_batches": nlp_batcher.stats() if nlp_batcher else None,
+        "language_tool_loaded": grammar_checker is not None,
+        "grammar": grammar_checker.stats() if grammar_checker else None,
         "redis_connected": redis_client is not None,
         "nats_connected": nats_client is not None
     }
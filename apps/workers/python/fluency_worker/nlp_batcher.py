@@ -0,0 +1,118 @@
+"""
+NLP Batcher - Micro-batched spaCy parsing for concurrent fluency jobs
+Transcripts from concurrent tasks wait in a queue for at most ``max_wait``
+seconds (or until ``max_batch`` are waiting) and are parsed together with
+``nlp.pipe``, so spaCy batches the work instead of parsing one Doc per call.
+Each Doc is handed back to the task that submitted its text.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 1000  # recent requests kept for latency percentiles
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+class NlpBatcher:
+    """Queue of (text, future) pairs drained into nlp.pipe batches"""
+
+    def __init__(self, nlp, max_batch: int = 32, max_wait: float = 0.02, pipe_batch_size: int = 16, n_process: int = 1):
+        self.nlp = nlp
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pipe_batch_size = pipe_batch_size
+        self.n_process = n_process
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.docs = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.queue_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.parse_seconds = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def parse(self, text: str):
+        """Doc for ``text``, parsed in the next batch"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future, time.monotonic()))
+        return await future
+
+    async def _run(self):
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + self.max_wait
+            # Collect until the batch is full or the oldest text has waited max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    entry = await asyncio.wait_for(self.queue.get(), max(deadline - time.monotonic(), 0.0))
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    await self._parse_batch(batch)
+                    return
+                batch.append(entry)
+            await self._parse_batch(batch)
+
+    def _pipe(self, texts: List[str]) -> list:
+        return list(self.nlp.pipe(texts, batch_size=self.pipe_batch_size, n_process=self.n_process))
+
+    async def _parse_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        dequeued = time.monotonic()
+        self.queue_latencies.extend(dequeued - queued for _, _, queued in batch)
+        try:
+            docs = await asyncio.to_thread(self._pipe, [text for text, _, _ in batch])
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"spaCy batch of {len(batch)} texts failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.parse_seconds += time.monotonic() - dequeued
+        self.batches += 1
+        self.docs += len(batch)
+        self.last_batch_size = len(batch)
+        for (_, future, _), doc in zip(batch, docs):
+            # The waiting task may have been cancelled
+            if not future.done():
+                future.set_result(doc)
+
+    async def close(self):
+        if self._task:
+            await self.queue.put(None)
+            await self._task
+
+    def stats(self):
+        latencies_ms = sorted(latency * 1000 for latency in self.queue_latencies)
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "docs": self.docs,
+            "failures": self.failures,
+            "mean_batch_size": round(self.docs / self.batches, 2) if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "queue_latency_ms": {
+                "p50": round(percentile(latencies_ms, 50), 2),
+                "p95": round(percentile(latencies_ms, 95), 2),
+                "max": round(latencies_ms[-1], 2) if latencies_ms else 0.0,
+            },
+            "parse_ms_per_doc": round(self.parse_seconds * 1000 / self.docs, 2) if self.docs else 0.0,
+        }
@@ -0,0 +1,148 @@
+"""
+Batch Pipeline - Download/analyze/write pipeline for prosody backfills
+Downloads run ahead of compute into a bounded prefetch queue, a fixed number of
+analysis workers drain it, and a single writer flushes finished sessions in
+groups so each group costs one Redis round trip. Progress and throughput are
+tracked per batch.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+MAX_REPORTED_ERRORS = 100
+
+
+class BatchProgress:
+    """Counters and throughput for one batch run"""
+
+    def __init__(self, batch_id: str, total: int):
+        self.batch_id = batch_id
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.errors: List[Dict[str, str]] = []
+        self.status = "queued"
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    def record_success(self, audio_seconds: float):
+        self.completed += 1
+        self.audio_seconds += audio_seconds
+
+    def record_failure(self, session_id: str, error: Exception):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"session_id": session_id, "error": str(error)})
+
+    def finish(self):
+        self.status = "completed" if self.failed == 0 else "completed_with_errors"
+        self._finished = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self._finished or time.monotonic()) - self._started
+        processed = self.completed + self.failed
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "remaining": self.total - processed,
+            "audio_hours": round(self.audio_seconds / 3600, 3),
+            "elapsed_seconds": round(elapsed, 1),
+            "sessions_per_minute": round(processed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "audio_hours_per_hour": round(self.audio_seconds / elapsed, 2) if elapsed > 0 else 0.0,
+            "started_at": self.started_at,
+            "errors": self.errors,
+        }
+
+
+async def run_batch(
+    items: Sequence[Any],
+    fetch: Callable[[Any], Awaitable[Any]],
+    analyze: Callable[[Any, Any], Awaitable[Dict[str, Any]]],
+    write: Callable[[List[Tuple[Any, Dict[str, Any]]], BatchProgress], Awaitable[None]],
+    progress: BatchProgress,
+    session_id: Callable[[Any], str],
+    prefetch: int = 4,
+    download_concurrency: int = 2,
+    workers: int = 2,
+    write_batch: int = 16,
+    write_interval: float = 1.0,
+):
+    """Run every item through fetch -> analyze -> write; per-item failures are recorded, not raised"""
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+    analyzed: asyncio.Queue = asyncio.Queue()
+    pending = iter(items)
+    progress.status = "processing"
+
+    async def downloader():
+        for item in pending:
+            try:
+                audio = await fetch(item)
+            except Exception as e:
+                audio = e
+            # Blocks once `prefetch` items are waiting for a worker
+            await fetched.put((item, audio))
+
+    async def feed():
+        await asyncio.gather(*(downloader() for _ in range(download_concurrency)))
+        for _ in range(workers):
+            await fetched.put(None)
+
+    async def worker():
+        while (entry := await fetched.get()) is not None:
+            item, audio = entry
+            if isinstance(audio, Exception):
+                await analyzed.put((item, None, audio))
+                continue
+            try:
+                await analyzed.put((item, await analyze(item, audio), None))
+            except Exception as e:
+                await analyzed.put((item, None, e))
+            finally:
+                del audio
+
+    async def analyze_all():
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await analyzed.put(None)
+
+    async def writer():
+        group, deadline, done = [], None, False
+        while not done:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                entry = await asyncio.wait_for(analyzed.get(), timeout)
+                done = entry is None
+                if entry is not None:
+                    group.append(entry)
+                    deadline = deadline or time.monotonic() + write_interval
+            except asyncio.TimeoutError:
+                pass
+            # Flush full groups, and partial ones that have waited write_interval
+            if group and (done or len(group) >= write_batch or time.monotonic() >= deadline):
+                await flush(group)
+                group, deadline = [], None
+
+    async def flush(group):
+        results = []
+        for item, result, error in group:
+            if error is not None:
+                progress.record_failure(session_id(item), error)
+            else:
+                progress.record_success(result.get("audio_duration", 0.0))
+                results.append((item, result))
+        try:
+            await write(results, progress)
+        except Exception as e:
+            # Nothing in the group was stored
+            for item, result in results:
+                progress.completed -= 1
+                progress.audio_seconds -= result.get("audio_duration", 0.0)
+                progress.record_failure(session_id(item), e)
+
+    await asyncio.gather(feed(), analyze_all(), writer())
+    progress.finish()
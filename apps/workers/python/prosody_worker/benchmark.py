@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Prosody Benchmark - Microbenchmarks for prosody analysis stages
+Times the optimized paths against their reference implementations on synthetic
+inputs (timeline and voice-quality also check the outputs agree; pause
+equivalence is covered by test_pauses.py). Parselmouth and librosa are
+imported by the voice-quality subcommand alone.
+
+    python benchmark.py pauses
+    python benchmark.py timeline
+    python benchmark.py voice-quality [recording.wav ...]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from pauses import MIN_PAUSE_DURATION, find_pause_segments
+from timeline import encode_timeline, timeline_to_points
+
+DURATIONS_MINUTES = (1, 10, 60)
+HOP_LENGTH = 0.010  # frame hop of features.HOP_LENGTH, without importing librosa
+SAMPLE_RATE = 16000  # features.SAMPLE_RATE
+
+
+def best_of(func: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def synthetic_rms(minutes: float, seed: int = 0) -> np.ndarray:
+    """Speech-like RMS track: noisy voiced runs separated by silences of varying floor level"""
+    rng = np.random.default_rng(seed)
+    n_frames = int(minutes * 60 / HOP_LENGTH)
+    n_runs = n_frames // 40 + 1
+    run_lengths = rng.integers(5, 120, size=n_runs)
+    run_levels = np.where(np.arange(n_runs) % 2 == 0, 0.1, rng.uniform(0.0005, 0.002, size=n_runs))
+    levels = np.repeat(run_levels, run_lengths)[:n_frames]
+    voiced = levels > 0.01
+    levels[voiced] *= rng.uniform(0.5, 1.5, size=voiced.sum())
+    return levels
+
+
+def reference_pause_segments(pause_mask: np.ndarray, times: np.ndarray,
+                             min_duration: float = MIN_PAUSE_DURATION) -> List[Dict[str, float]]:
+    """The original frame-by-frame loop from analyze_pauses"""
+    pause_segments = []
+    in_pause = False
+    pause_start = 0
+
+    for i, is_pause in enumerate(pause_mask):
+        if is_pause and not in_pause:
+            pause_start = times[i]
+            in_pause = True
+        elif not is_pause and in_pause:
+            pause_duration = times[i] - pause_start
+            if pause_duration > min_duration:
+                pause_segments.append({"start": float(pause_start), "end": float(times[i]), "duration": float(pause_duration)})
+            in_pause = False
+
+    if in_pause:
+        pause_duration = times[-1] - pause_start
+        if pause_duration > min_duration:
+            pause_segments.append({"start": float(pause_start), "end": float(times[-1]), "duration": float(pause_duration)})
+
+    return pause_segments
+
+
+def bench_pauses(args):
+    print(f"{'input':>8}{'frames':>10}{'pauses':>8}{'loop ms':>10}{'numpy ms':>10}{'speedup':>9}")
+    for minutes in DURATIONS_MINUTES:
+        rms = synthetic_rms(minutes)
+        times = np.arange(len(rms)) * HOP_LENGTH
+        pause_mask = rms < np.percentile(rms, 20)
+
+        segments = find_pause_segments(pause_mask, times)
+        loop_time = best_of(lambda: reference_pause_segments(pause_mask, times), args.repeats)
+        numpy_time = best_of(lambda: find_pause_segments(pause_mask, times), args.repeats)
+        print(f"{minutes:>6}m{len(rms):>11}{len(segments):>8}{loop_time * 1000:>10.2f}{numpy_time * 1000:>10.2f}"
+              f"{loop_time / numpy_time:>8.1f}x")
+
+
+def legacy_points(values: np.ndarray, times: np.ndarray) -> List[Dict[str, float]]:
+    """The original per-frame timeline objects (NaN frames omitted)"""
+    present = ~np.isnan(values)
+    return [{"timestamp": float(t), "value": float(v)} for t, v in zip(times[present], values[present])]
+
+
+def bench_timeline(args):
+    print(f"{'input':>8}{'series':>7}{'frames':>10}{'json KiB':>11}{'columnar KiB':>14}{'ratio':>8}{'json ms':>10}{'columnar ms':>13}")
+    for minutes in DURATIONS_MINUTES:
+        rms = synthetic_rms(minutes)
+        rms_db = 20 * np.log10(rms + 1e-10)
+        # Voiced F0 only where there is energy, like the Praat pitch track
+        f0 = np.where(rms > 0.01, 120 + 30 * np.sin(np.arange(len(rms)) / 50), np.nan)
+        times = np.arange(len(rms)) * HOP_LENGTH
+
+        for name, values in (("f0", f0), ("rms", rms_db)):
+            points = legacy_points(values, times)
+            columnar = encode_timeline(values, 0.0, HOP_LENGTH)
+            decoded = timeline_to_points(columnar)
+            assert len(decoded) == len(points), "columnar timeline lost frames"
+            assert np.allclose([p["value"] for p in decoded], [p["value"] for p in points], rtol=1e-6, atol=1e-4)
+
+            json_bytes = len(json.dumps(points))
+            columnar_bytes = len(json.dumps(columnar))
+            json_time = best_of(lambda: json.dumps(legacy_points(values, times)), args.repeats)
+            columnar_time = best_of(lambda: json.dumps(encode_timeline(values, 0.0, HOP_LENGTH)), args.repeats)
+            print(f"{minutes:>6}m{name:>8}{len(values):>10}{json_bytes / 1024:>11.1f}{columnar_bytes / 1024:>14.1f}"
+                  f"{json_bytes / columnar_bytes:>7.1f}x{json_time * 1000:>10.2f}{columnar_time * 1000:>13.2f}")
+
+
+def synthetic_voice(minutes: float, seed: int = 0) -> np.ndarray:
+    """Pulse-train "speech" around 120 Hz with cycle-to-cycle jitter/shimmer, breath noise and silent gaps"""
+    rng = np.random.default_rng(seed)
+    n_samples = int(minutes * 60 * SAMPLE_RATE)
+    y = np.zeros(n_samples, dtype=np.float32)
+    t = 0.0
+    while t < minutes * 60:
+        period = 1 / (120 + 20 * np.sin(t)) * rng.normal(1.0, 0.01)
+        index = int(t * SAMPLE_RATE)
+        if (t % 4.0) < 3.0 and index < n_samples - 200:
+            pulse = np.exp(-np.arange(200) / 30.0) * np.sin(np.arange(200) * 2 * np.pi * 700 / SAMPLE_RATE)
+            y[index:index + 200] += 0.3 * rng.normal(1.0, 0.05) * pulse
+        t += period
+    return y + rng.normal(0, 0.002, n_samples).astype(np.float32)
+
+
+def voice_quality_inputs(args):
+    """Synthetic 1 and 10 minute inputs, or the given recordings resampled to the worker rate"""
+    import parselmouth
+
+    if not args.audio:
+        for minutes in (1, 10):
+            yield f"{minutes}m", parselmouth.Sound(synthetic_voice(minutes).astype(np.float64), sampling_frequency=SAMPLE_RATE)
+        return
+    for path in args.audio:
+        yield path.rsplit("/", 1)[-1][:8], parselmouth.Sound(path).convert_to_mono().resample(SAMPLE_RATE)
+
+
+def bench_voice_quality(args):
+    import parselmouth
+
+    from features import PITCH_CEILING, PITCH_FLOOR
+    from voice_quality import VOICE_QUALITY_FIELDS, per_measure_voice_quality, voice_report
+
+    print(f"{'input':>8}{'point process ms':>18}{'per-measure ms':>16}{'voice report ms':>17}{'session ms':>12}{'max rel diff':>14}{'hnr dB':>15}")
+    for label, sound in voice_quality_inputs(args):
+        pitch = sound.to_pitch(pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING)
+        point_process = parselmouth.praat.call([sound, pitch], "To PointProcess (cc)")
+
+        expected = per_measure_voice_quality(sound, point_process)
+        measures = voice_report(sound, pitch, point_process, PITCH_FLOOR, PITCH_CEILING)
+        # HNR is excluded: the report averages voiced intervals only, the harmonicity mean every sounding frame
+        for key in VOICE_QUALITY_FIELDS[:-1]:
+            # The report prints four significant digits and bounds periods by the pitch range
+            assert np.isclose(measures[key], expected[key], rtol=1e-2), f"{key}: {measures[key]} != {expected[key]}"
+        max_diff = max(abs(measures[key] - expected[key]) / abs(expected[key]) for key in VOICE_QUALITY_FIELDS[:-1])
+
+        pp_time = best_of(lambda: parselmouth.praat.call([sound, pitch], "To PointProcess (cc)"), args.repeats)
+        reference_time = best_of(lambda: per_measure_voice_quality(sound, point_process), args.repeats)
+        report_time = best_of(lambda: voice_report(sound, pitch, point_process, PITCH_FLOOR, PITCH_CEILING), args.repeats)
+        print(f"{label:>8}{pp_time * 1000:>18.1f}{reference_time * 1000:>16.1f}{report_time * 1000:>17.1f}"
+              f"{(pp_time + report_time) * 1000:>12.1f}{max_diff:>14.1e}{measures['hnr']:>8.1f} / {expected['hnr']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("pauses", help="Run-length pause segmentation vs the per-frame loop").set_defaults(func=bench_pauses)
+    voice_quality = subcommands.add_parser("voice-quality", help="One Praat voice report vs one call per jitter/shimmer/HNR measure")
+    voice_quality.add_argument("audio", nargs="*", help="recordings to compare on (default: synthetic pulse trains)")
+    voice_quality.set_defaults(func=bench_voice_quality)
+    subcommands.add_parser("timeline", help="Columnar float32 timelines vs per-frame JSON points").set_defaults(func=bench_timeline)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Chunked Analysis - Bounded-memory prosody for very long recordings
+Reads the file block by block (soundfile + soxr, or an ffmpeg pipe for formats
+libsndfile cannot read), resamples to 16 kHz mono on the fly and feeds the
+streaming analyzer, so memory depends on the block size rather than the
+recording length. PCM already decoded into the node cache is streamed the same
+way from its memory map. Each analysis tracks how far resident memory grows
+over its own starting baseline, so the budget applies per analysis rather than
+to everything the worker happens to be running at the same time.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from features import SAMPLE_RATE
+from streaming import StreamingProsodyAnalyzer
+
+BLOCK_SECONDS = 30.0
+# Peak bytes per sample of whole-file analysis: float32 PCM, float64 Praat Sound, pitch and RMS frames
+FULL_ANALYSIS_BYTES_PER_SAMPLE = 32
+
+
+def statm_rss_bytes(pid: Any = "self") -> int:
+    """Anonymous resident memory of a process; file-backed pages (e.g. memory-mapped cached PCM) are reclaimable and not counted"""
+    with open(f"/proc/{pid}/statm") as f:
+        fields = f.read().split()
+    return (int(fields[1]) - int(fields[2])) * os.sysconf("SC_PAGE_SIZE")
+
+
+def current_rss_bytes(pids: Sequence[int] = ()) -> int:
+    """Anonymous resident memory of this process plus the given helper processes (e.g. analyzer pool workers)"""
+    total = statm_rss_bytes()
+    for pid in pids:
+        try:
+            total += statm_rss_bytes(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            # Worker exited (recycled pool) between listing and reading
+            pass
+    return total
+
+
+class RssTracker:
+    """Peak anonymous RSS growth of one analysis over the baseline at its start
+
+    ``sample()`` is called per block by chunked analysis; used as a context
+    manager it also samples from a background thread, for whole-file analysis
+    that has no block boundaries. Growth caused by other analyses running in the
+    same worker at the same time is included, so this is an upper bound.
+    """
+
+    def __init__(self, pids: Optional[Callable[[], Sequence[int]]] = None, interval: float = 0.05):
+        self.pids = pids or (lambda: ())
+        self.interval = interval
+        self.baseline = current_rss_bytes(self.pids())
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> int:
+        """Current growth over the baseline (bytes), updating the peak"""
+        rss = current_rss_bytes(self.pids())
+        self.peak = max(self.peak, rss)
+        return rss - self.baseline
+
+    @property
+    def peak_growth(self) -> int:
+        return max(0, self.peak - self.baseline)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "RssTracker":
+        self._thread = threading.Thread(target=self._run, name="rss-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "peak_rss_mb": round(self.peak_growth / 2**20, 1),
+            "baseline_rss_mb": round(self.baseline / 2**20, 1),
+        }
+
+
+def audio_duration(path: str) -> float:
+    """Duration from the container header, without decoding"""
+    try:
+        return sf.info(path).duration
+    except RuntimeError:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, check=True, text=True,
+        ).stdout
+        return float(out.strip() or 0.0)
+
+
+def exceeds_budget(n_samples: float, budget_bytes: int) -> bool:
+    """Whether whole-file analysis of ``n_samples`` samples at 16 kHz would grow RSS past the per-analysis budget"""
+    return n_samples * FULL_ANALYSIS_BYTES_PER_SAMPLE > budget_bytes
+
+
+def needs_chunking(path: str, budget_bytes: int) -> bool:
+    """Whether analyzing the whole decoded file at once would exceed the memory budget"""
+    return exceeds_budget(audio_duration(path) * SAMPLE_RATE, budget_bytes)
+
+
+def iter_pcm_blocks(path: str, block_seconds: float = BLOCK_SECONDS, sr: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """Yield mono float32 PCM at ``sr`` in blocks of about ``block_seconds``"""
+    try:
+        info = sf.info(path)
+    except RuntimeError:
+        yield from _iter_ffmpeg_blocks(path, block_seconds, sr)
+        return
+
+    resampler = soxr.ResampleStream(info.samplerate, sr, 1, dtype="float32") if info.samplerate != sr else None
+    blocksize = int(block_seconds * info.samplerate)
+    for block in sf.blocks(path, blocksize=blocksize, dtype="float32", always_2d=True):
+        mono = block.mean(axis=1, dtype=np.float32)
+        yield resampler.resample_chunk(mono) if resampler else mono
+    if resampler:
+        yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+def _iter_ffmpeg_blocks(path: str, block_seconds: float, sr: int) -> Iterator[np.ndarray]:
+    # Same decode as decode_pcm, read from the pipe a block at a time
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-",
+    ]
+    block_bytes = int(block_seconds * sr) * 2
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 2], np.int16).astype(np.float32) / 32768.0
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode} decoding {path}")
+
+
+def iter_array_blocks(y: np.ndarray, block_seconds: float = BLOCK_SECONDS, sr: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """Copy blocks out of a (possibly memory-mapped) PCM array so only one block is resident at a time"""
+    block_samples = int(block_seconds * sr)
+    for start in range(0, len(y), block_samples):
+        yield np.array(y[start:start + block_samples], dtype=np.float32)
+
+
+def analyze_blocks_chunked(blocks: Iterable[np.ndarray], budget_bytes: int, block_seconds: float = BLOCK_SECONDS) -> Dict[str, Any]:
+    """Feed PCM blocks through the incremental analyzer; returns its summary plus memory statistics
+
+    Raises MemoryError when this analysis has grown RSS past ``budget_bytes`` over
+    its starting baseline; memory other analyses already held does not count.
+    """
+    tracker = RssTracker()
+    analyzer = StreamingProsodyAnalyzer(emit_interval=float("inf"))
+    blocks_seen = 0
+    for block in blocks:
+        analyzer.push(block)
+        blocks_seen += 1
+        growth = tracker.sample()
+        if growth > budget_bytes:
+            raise MemoryError(f"Analysis grew RSS by {growth / 2**20:.0f} MB, over the {budget_bytes / 2**20:.0f} MB prosody budget")
+
+    summary = analyzer.finalize()
+    tracker.sample()
+    summary["memory"] = {
+        "mode": "chunked",
+        "blocks": blocks_seen,
+        "block_seconds": block_seconds,
+        **tracker.stats(),
+        "budget_mb": round(budget_bytes / 2**20, 1),
+    }
+    return summary
+
+
+def analyze_file_chunked(path: str, budget_bytes: int, block_seconds: float = BLOCK_SECONDS) -> Dict[str, Any]:
+    """Stream a file through the incremental analyzer"""
+    return analyze_blocks_chunked(iter_pcm_blocks(path, block_seconds), budget_bytes, block_seconds)
+
+
+def analyze_pcm_chunked(y: np.ndarray, budget_bytes: int, block_seconds: float = BLOCK_SECONDS) -> Dict[str, Any]:
+    """Stream already-decoded 16 kHz PCM (e.g. a cached memory map) through the incremental analyzer"""
+    return analyze_blocks_chunked(iter_array_blocks(y, block_seconds), budget_bytes, block_seconds)
@@ -0,0 +1,166 @@
+"""
+Analyzer Executor - Concurrent prosody analyzers with per-analyzer timeouts
+In "process" mode the decoded PCM is copied once into a shared-memory block and
+each analyzer task runs in a pooled worker process that attaches to it without a
+copy; in "thread" mode analyzers share the caller's FeatureContext in threads.
+Isolated analyzers (jitter/shimmer) get a pool of their own: when one of their
+calls times out that pool is swapped for a fresh one and its processes are
+terminated once nobody can still be waiting on them, so a stuck computation
+never holds a slot other analyses queue behind.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("process", "thread")
+
+
+class SharedAudio(NamedTuple):
+    """Picklable handle to PCM in a shared-memory block"""
+    name: str
+    length: int
+
+
+@contextmanager
+def share_audio(y: np.ndarray):
+    """Copy PCM into a fresh shared-memory block for the duration of one analysis"""
+    pcm = np.ascontiguousarray(y, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(pcm.nbytes, 1))
+    try:
+        np.ndarray(pcm.shape, dtype=np.float32, buffer=shm.buf)[:] = pcm
+        yield SharedAudio(shm.name, len(pcm))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def attach_audio(audio: SharedAudio):
+    """Map a shared PCM block in a worker process; the creator owns its lifetime"""
+    # Pool workers share the parent's resource tracker, so attaching does not take ownership
+    shm = shared_memory.SharedMemory(name=audio.name)
+    y = np.ndarray((audio.length,), dtype=np.float32, buffer=shm.buf)
+    try:
+        yield y
+    finally:
+        del y
+        shm.close()
+
+
+class AnalyzerExecutor:
+    """Runs analyzers on a shared pool and substitutes defaults for stragglers"""
+
+    def __init__(self, mode: str = "process", max_workers: Optional[int] = None,
+                 isolated: Sequence[str] = (), isolated_workers: int = 1):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown prosody executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.isolated = frozenset(isolated)
+        self.isolated_workers = isolated_workers
+        self.pool = self._new_pool(max_workers)
+        self.isolated_pool = self._new_pool(isolated_workers) if self.isolated and mode == "process" else None
+        self.retired: List[Executor] = []
+        self.completed: Dict[str, int] = {}
+        self.timeouts: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.stuck: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+        self.recycled = 0
+
+    def _new_pool(self, max_workers: Optional[int]) -> Executor:
+        if self.mode == "process":
+            # Spawned, so workers never inherit the event loop or open connections
+            return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(max_workers)
+
+    async def run(self, name: str, func: Callable, *args, timeout: float, default: Optional[Any] = None) -> Any:
+        """Run ``func(*args)`` on the pool; on timeout return ``default`` or raise if there is none
+
+        A timed-out call of an isolated analyzer recycles its pool in process mode.
+        Threads cannot be stopped, so in thread mode an isolated analyzer returns
+        ``default`` without running while a timed-out call of it is still running.
+        """
+        if name in self.isolated and self.isolated_pool is None and self.stuck.get(name) and default is not None:
+            self.skipped[name] = self.skipped.get(name, 0) + 1
+            logger.warning(f"Analyzer {name} skipped: {self.stuck[name]} timed-out call(s) still running")
+            return default
+
+        pool = self.isolated_pool if name in self.isolated and self.isolated_pool is not None else self.pool
+        future = pool.submit(func, *args)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            self.completed[name] = self.completed.get(name, 0) + 1
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+            logger.error(f"Analyzer {name} timed out after {timeout:.0f}s")
+            self._abandon(name, future, pool, timeout)
+            if default is None:
+                raise
+            return default
+        except Exception:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            raise
+
+    def _abandon(self, name: str, future: Future, pool: Executor, timeout: float):
+        """Track a timed-out call until it really ends, and recycle the isolated pool it is stuck in"""
+        loop = asyncio.get_running_loop()
+        self.stuck[name] = self.stuck.get(name, 0) + 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, name))
+        if pool is self.isolated_pool:
+            # New calls go to a fresh pool; every call already given to the old one has
+            # finished or been given up by its caller within ``timeout``
+            self.isolated_pool = self._new_pool(self.isolated_workers)
+            self.retired.append(pool)
+            self.recycled += 1
+            loop.call_later(timeout, self._terminate, pool)
+            logger.warning(f"Recycled the {name} pool; the stuck worker is terminated in {timeout:.0f}s")
+
+    def _release(self, name: str):
+        self.stuck[name] -= 1
+
+    def _terminate(self, pool: Executor):
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if pool in self.retired:
+            self.retired.remove(pool)
+
+    def worker_pids(self) -> List[int]:
+        """Pids of the pools' live worker processes (none in thread mode), for memory accounting"""
+        pids = []
+        for pool in (self.pool, self.isolated_pool, *self.retired):
+            processes = getattr(pool, "_processes", None) or {}
+            pids.extend(process.pid for process in list(processes.values()))
+        return pids
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.isolated_pool is not None:
+            self.isolated_pool.shutdown(wait=False, cancel_futures=True)
+        for pool in list(self.retired):
+            self._terminate(pool)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "isolated": sorted(self.isolated),
+            "isolated_workers": self.isolated_workers,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "stuck": self.stuck,
+            "skipped": self.skipped,
+            "recycled_pools": self.recycled,
+        }
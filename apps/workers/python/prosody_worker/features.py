@@ -0,0 +1,120 @@
+"""
+Feature Context - Decode-once shared features for prosody analysis
+Builds one Parselmouth Sound from the decoded buffer and computes pitch, the
+periodic point process, the voice report and frame RMS at most once, timing
+every stage.
+"""
+
+import copyreg
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Dict, Optional
+
+import librosa
+import numpy as np
+import parselmouth
+
+from voice_quality import voice_measures
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 0.025  # 25ms frames
+HOP_LENGTH = 0.010    # 10ms hop
+PITCH_FLOOR = 75
+PITCH_CEILING = 600
+
+
+def _load_pitch(data: bytes) -> parselmouth.Pitch:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pitch.bin")
+        with open(path, "wb") as f:
+            f.write(data)
+        return parselmouth.read(path)
+
+
+def _reduce_pitch(pitch: parselmouth.Pitch):
+    """Pickle a Pitch as its Praat binary file (exact, candidates included) so pool workers can pass it on"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pitch.bin")
+        pitch.save(path, parselmouth.Data.FileFormat.BINARY)
+        with open(path, "rb") as f:
+            return _load_pitch, (f.read(),)
+
+
+copyreg.pickle(parselmouth.Pitch, _reduce_pitch)
+
+
+class FeatureContext:
+    """Decoded 16 kHz mono PCM plus lazily computed features shared by all analyzers"""
+
+    def __init__(self, y: np.ndarray, sr: int = SAMPLE_RATE, pitch: Optional[parselmouth.Pitch] = None):
+        self.y = y
+        self.sr = sr
+        self.timings: Dict[str, float] = {}
+        if pitch is not None:
+            # Pitch track already computed elsewhere (e.g. by the F0 pool worker)
+            self.__dict__["pitch"] = pitch
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = round(self.timings.get(stage, 0.0) + time.perf_counter() - started, 4)
+
+    @property
+    def duration(self) -> float:
+        return len(self.y) / self.sr
+
+    @property
+    def frame_length(self) -> int:
+        return int(FRAME_LENGTH * self.sr)
+
+    @property
+    def hop_length(self) -> int:
+        return int(HOP_LENGTH * self.sr)
+
+    @cached_property
+    def sound(self) -> parselmouth.Sound:
+        with self.timed("sound"):
+            return parselmouth.Sound(np.asarray(self.y, dtype=np.float64), sampling_frequency=self.sr)
+
+    @cached_property
+    def pitch(self) -> parselmouth.Pitch:
+        sound = self.sound
+        with self.timed("pitch"):
+            return sound.to_pitch(pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING)
+
+    @cached_property
+    def point_process(self) -> parselmouth.Data:
+        sound, pitch = self.sound, self.pitch
+        with self.timed("point_process"):
+            return parselmouth.praat.call([sound, pitch], "To PointProcess (cc)")
+
+    @cached_property
+    def voice_report(self) -> Dict[str, float]:
+        """Jitter, shimmer and HNR from one Praat voice report, shared by prosody and scoring"""
+        sound, pitch, point_process = self.sound, self.pitch, self.point_process
+        with self.timed("voice_report"):
+            return voice_measures(sound, pitch, point_process, PITCH_FLOOR, PITCH_CEILING)
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        with self.timed("rms"):
+            return librosa.feature.rms(y=self.y, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+
+    @cached_property
+    def rms_times(self) -> np.ndarray:
+        return librosa.frames_to_time(np.arange(len(self.rms)), sr=self.sr, hop_length=self.hop_length)
+
+    def prepare(self, point_process: bool = True):
+        """Compute every shared feature up front so analyzer timings exclude them"""
+        self.sound
+        self.pitch
+        if point_process:
+            self.point_process
+        self.rms
+        self.rms_times
@@ -8,19 +8,34 @@ import asyncio
 import json
 import logging
 import os
-import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import numpy as np
-import librosa
-import parselmouth
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 import redis.asyncio as redis
 from nats.aio.client import Client as NATS
 
+from batch import BatchProgress, run_batch
+from chunked import RssTracker, analyze_file_chunked, analyze_pcm_chunked, exceeds_budget, needs_chunking
+from executor import AnalyzerExecutor, SharedAudio, attach_audio, share_audio
+from features import FeatureContext, SAMPLE_RATE
+from timeline import (
+    TIMELINE_METRICS, build_level, build_pyramids, decode_values, encode_timeline, expand_timelines,
+    is_columnar, level_to_points, slice_level, timeline_times,
+)
+from pace import WPM_HOP, WPM_WINDOW, overall_articulation_rate, windowed_pace, word_times
+from pitch_stats import f0_statistics
+from pauses import MIN_PAUSE_DURATION, find_pause_segments, pause_summary
+from streaming import StreamingProsodyAnalyzer
+from voice_quality import voice_quality_stats
+from workers.audio_cache import SharedAudioCache, decode_pcm
+from workers.fetch import media_fetcher
+from workers.metrics_sink import MetricSeries, MetricsSink, metrics_sink_from_env
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,18 +46,37 @@ app = FastAPI(title="Prosody Worker", version="1.0.0")
 # Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 NATS_URL = os.getenv("NATS_URL", "nats://localhost:4222")
-SAMPLE_RATE = 16000
-FRAME_LENGTH = 0.025  # 25ms frames
-HOP_LENGTH = 0.010    # 10ms hop
+PROSODY_EXECUTOR = os.getenv("PROSODY_EXECUTOR", "process")  # "process" (shared-memory pool) or "thread"
+PROSODY_WORKERS = int(os.getenv("PROSODY_WORKERS", str(os.cpu_count() or 4)))
+ANALYZER_TIMEOUT = float(os.getenv("PROSODY_ANALYZER_TIMEOUT", "300"))
+JITTER_TIMEOUT = float(os.getenv("PROSODY_JITTER_TIMEOUT", "60"))
+JITTER_WORKERS = int(os.getenv("PROSODY_JITTER_WORKERS", str(max(1, PROSODY_WORKERS // 4))))  # own pool, recycled on timeout
+WPM_WINDOW_SECONDS = float(os.getenv("WPM_WINDOW_SECONDS", str(WPM_WINDOW)))
+WPM_HOP_SECONDS = float(os.getenv("WPM_HOP_SECONDS", str(WPM_HOP)))
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "10"))
+STREAM_EMIT_SECONDS = float(os.getenv("STREAM_EMIT_SECONDS", "1"))
+PROSODY_RSS_BUDGET_MB = int(os.getenv("PROSODY_RSS_BUDGET_MB", "2048"))  # RSS growth allowed per analysis
+BATCH_PREFETCH = int(os.getenv("BATCH_PREFETCH", "4"))  # downloaded sessions waiting ahead of compute
+BATCH_DOWNLOAD_CONCURRENCY = int(os.getenv("BATCH_DOWNLOAD_CONCURRENCY", "2"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(max(1, PROSODY_WORKERS // 4))))  # sessions analyzed at once
+BATCH_WRITE_SIZE = int(os.getenv("BATCH_WRITE_SIZE", "16"))
+TIMELINE_MAX_POINTS = int(os.getenv("TIMELINE_MAX_POINTS", "2000"))  # auto resolution picks the finest level under this
+METRICS_SINK_RESOLUTION = float(os.getenv("METRICS_SINK_RESOLUTION", "1.0"))  # seconds per stored F0/RMS point
 
 # Global variables
 redis_client: Optional[redis.Redis] = None
 nats_client: Optional[NATS] = None
+audio_cache: Optional[SharedAudioCache] = None
+analyzer_executor: Optional[AnalyzerExecutor] = None
+metrics_sink: Optional[MetricsSink] = None
 
 class ProsodyAnalysisRequest(BaseModel):
     session_id: str
     audio_url: str
     transcript_data: Optional[Dict[str, Any]] = None
+    timeline_format: str = "columnar"  # "columnar" (float32 base64) or "json" (timestamp/value points)
+    chunked: Optional[bool] = None  # None: chunked only when whole-file analysis would exceed the RSS budget
+    recorded_at: Optional[datetime] = None  # session start; defaults to the session's creation time in the metric store
 
 class ProsodyAnalysisResponse(BaseModel):
     session_id: str
@@ -50,86 +84,57 @@ class ProsodyAnalysisResponse(BaseModel):
     status: str
     message: str
 
+class BatchItem(BaseModel):
+    session_id: str
+    audio_url: str
+    transcript_data: Optional[Dict[str, Any]] = None
+    recorded_at: Optional[datetime] = None
+
+class BatchProsodyRequest(BaseModel):
+    items: List[BatchItem]
+    timeline_format: str = "columnar"
+    publish: bool = True  # emit prosody.done per session so downstream scoring re-runs
+
+class BatchProsodyResponse(BaseModel):
+    batch_id: str
+    total: int
+    status: str
+    message: str
+
 async def download_audio(audio_url: str) -> str:
     """Download audio file from URL to temporary file"""
-    import requests
-    
     try:
-        response = requests.get(audio_url, stream=True)
-        response.raise_for_status()
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        temp_path = temp_file.name
-        temp_file.close()
-        
-        # Write audio data
-        with open(temp_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        logger.info(f"Downloaded audio to: {temp_path}")
+        temp_path, stats = await media_fetcher.fetch_to_tempfile(audio_url, suffix=".wav")
+        logger.info(f"Downloaded audio to: {temp_path} ({stats.megabytes_per_second:.1f} MB/s)")
         return temp_path
     except Exception as e:
         logger.error(f"Failed to download audio: {e}")
         raise
 
-def analyze_f0(audio_path: str) -> Dict[str, Any]:
+def analyze_f0(ctx: FeatureContext, include_timeline: bool = True) -> Dict[str, Any]:
     """Analyze fundamental frequency (F0) using Parselmouth"""
     try:
-        # Load audio with Parselmouth
-        sound = parselmouth.Sound(audio_path)
-        
-        # Extract pitch
-        pitch = sound.to_pitch()
+        # Shared pitch track; all statistics are NumPy reductions over the voiced frames
+        pitch = ctx.pitch
         f0_values = pitch.selected_array['frequency']
-        f0_times = pitch.xs()
-        
-        # Filter out unvoiced segments (F0 = 0)
-        voiced_mask = f0_values > 0
-        voiced_f0 = f0_values[voiced_mask]
-        voiced_times = f0_times[voiced_mask]
-        
-        if len(voiced_f0) == 0:
-            return {
-                "mean": 0.0,
-                "std": 0.0,
-                "min": 0.0,
-                "max": 0.0,
-                "timeline": []
-            }
-        
-        # Calculate statistics
-        f0_stats = {
-            "mean": float(np.mean(voiced_f0)),
-            "std": float(np.std(voiced_f0)),
-            "min": float(np.min(voiced_f0)),
-            "max": float(np.max(voiced_f0)),
-            "timeline": [
-                {"timestamp": float(t), "value": float(f0)}
-                for t, f0 in zip(voiced_times, voiced_f0)
-            ]
-        }
+        f0_stats = f0_statistics(f0_values, pitch.xs())
+        
+        if include_timeline:
+            # Unvoiced frames (F0 = 0) stay in the timeline as NaN
+            f0_stats["timeline"] = encode_timeline(np.where(f0_values > 0, f0_values, np.nan), pitch.x1, pitch.dx)
         
-        logger.info(f"F0 analysis completed: mean={f0_stats['mean']:.1f}Hz")
+        logger.info(f"F0 analysis completed: mean={f0_stats['mean']:.1f}Hz, range={f0_stats['range_semitones']:.1f}st, {f0_stats['phrases']['count']} phrases")
         return f0_stats
         
     except Exception as e:
         logger.error(f"F0 analysis failed: {e}")
         raise
 
-def analyze_rms(audio_path: str) -> Dict[str, Any]:
+def analyze_rms(ctx: FeatureContext) -> Dict[str, Any]:
     """Analyze Root Mean Square (RMS) energy"""
     try:
-        # Load audio with librosa
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-        
-        # Calculate RMS energy
-        frame_length = int(FRAME_LENGTH * sr)
-        hop_length = int(HOP_LENGTH * sr)
-        
-        rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-        times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=hop_length)
+        # Shared frame RMS energy
+        rms = ctx.rms
         
         # Convert to dB
         rms_db = 20 * np.log10(rms + 1e-10)
@@ -139,10 +144,7 @@ def analyze_rms(audio_path: str) -> Dict[str, Any]:
             "std": float(np.std(rms_db)),
             "min": float(np.min(rms_db)),
             "max": float(np.max(rms_db)),
-            "timeline": [
-                {"timestamp": float(t), "value": float(rms_val)}
-                for t, rms_val in zip(times, rms_db)
-            ]
+            "timeline": encode_timeline(rms_db, 0.0, ctx.hop_length / ctx.sr)
         }
         
         logger.info(f"RMS analysis completed: mean={rms_stats['mean']:.1f}dB")
@@ -152,97 +154,46 @@ def analyze_rms(audio_path: str) -> Dict[str, Any]:
         logger.error(f"RMS analysis failed: {e}")
         raise
 
-def analyze_jitter_shimmer(audio_path: str) -> Dict[str, Any]:
-    """Analyze jitter and shimmer using Parselmouth"""
+JITTER_SHIMMER_DEFAULTS = {
+    "jitter_local": 0.0,
+    "shimmer_local": 0.0,
+    "jitter_rap": 0.0,
+    "jitter_ppq5": 0.0,
+    "shimmer_apq3": 0.0,
+    "shimmer_apq5": 0.0,
+    "hnr": 0.0,
+}
+
+def analyze_jitter_shimmer(ctx: FeatureContext) -> Dict[str, Any]:
+    """Analyze jitter, shimmer and HNR using Parselmouth"""
     try:
-        # Load audio with Parselmouth
-        sound = parselmouth.Sound(audio_path)
-        
-        # Extract pitch
-        pitch = sound.to_pitch()
-        
-        # Calculate jitter (local)
-        point_process = parselmouth.praat.call(sound, "To PointProcess (periodic, cc)...", 75, 600)
-        jitter_local = parselmouth.praat.call(point_process, "Get jitter (local)...", 0, 0, 0.0001, 0.02, 1.3)
-        
-        # Calculate shimmer (local)
-        shimmer_local = parselmouth.praat.call(point_process, "Get shimmer (local)...", 0, 0, 0.0001, 0.02, 1.3, 1.6)
-        
-        jitter_shimmer_stats = {
-            "jitter_local": float(jitter_local),
-            "shimmer_local": float(shimmer_local),
-            "jitter_rap": float(parselmouth.praat.call(point_process, "Get jitter (rap)...", 0, 0, 0.0001, 0.02, 1.3)),
-            "jitter_ppq5": float(parselmouth.praat.call(point_process, "Get jitter (ppq5)...", 0, 0, 0.0001, 0.02, 1.3)),
-            "shimmer_apq3": float(parselmouth.praat.call(point_process, "Get shimmer (apq3)...", 0, 0, 0.0001, 0.02, 1.3, 1.6)),
-            "shimmer_apq5": float(parselmouth.praat.call(point_process, "Get shimmer (apq5)...", 0, 0, 0.0001, 0.02, 1.3, 1.6)),
-        }
+        # Single voice report over the shared sound, pitch and point process
+        jitter_shimmer_stats = voice_quality_stats(ctx.voice_report)
         
-        logger.info(f"Jitter/Shimmer analysis completed: jitter={jitter_shimmer_stats['jitter_local']:.3f}, shimmer={jitter_shimmer_stats['shimmer_local']:.3f}")
+        logger.info(f"Jitter/Shimmer analysis completed: jitter={jitter_shimmer_stats['jitter_local']:.3f}, shimmer={jitter_shimmer_stats['shimmer_local']:.3f}, hnr={jitter_shimmer_stats['hnr']:.1f}dB")
         return jitter_shimmer_stats
         
     except Exception as e:
         logger.error(f"Jitter/Shimmer analysis failed: {e}")
-        return {
-            "jitter_local": 0.0,
-            "shimmer_local": 0.0,
-            "jitter_rap": 0.0,
-            "jitter_ppq5": 0.0,
-            "shimmer_apq3": 0.0,
-            "shimmer_apq5": 0.0,
-        }
+        return dict(JITTER_SHIMMER_DEFAULTS)
 
-def analyze_pauses(audio_path: str, transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def analyze_pauses(ctx: FeatureContext, transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Analyze pauses in speech"""
     try:
-        # Load audio with librosa
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-        
-        # Calculate RMS energy
-        frame_length = int(FRAME_LENGTH * sr)
-        hop_length = int(HOP_LENGTH * sr)
-        rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-        times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=hop_length)
+        # Shared frame RMS energy
+        rms = ctx.rms
+        times = ctx.rms_times
         
         # Define pause threshold (adjust based on your needs)
         pause_threshold = np.percentile(rms, 20)
         
-        # Find pause segments
+        # Find pause segments (vectorized run-length over the pause mask)
         pause_mask = rms < pause_threshold
-        pause_segments = []
-        
-        # Group consecutive pause frames
-        in_pause = False
-        pause_start = 0
-        
-        for i, is_pause in enumerate(pause_mask):
-            if is_pause and not in_pause:
-                pause_start = times[i]
-                in_pause = True
-            elif not is_pause and in_pause:
-                pause_duration = times[i] - pause_start
-                if pause_duration > 0.1:  # Minimum pause duration (100ms)
-                    pause_segments.append({
-                        "start": float(pause_start),
-                        "end": float(times[i]),
-                        "duration": float(pause_duration)
-                    })
-                in_pause = False
-        
-        # Handle case where audio ends with a pause
-        if in_pause:
-            pause_duration = times[-1] - pause_start
-            if pause_duration > 0.1:
-                pause_segments.append({
-                    "start": float(pause_start),
-                    "end": float(times[-1]),
-                    "duration": float(pause_duration)
-                })
+        segments = find_pause_segments(pause_mask, times, MIN_PAUSE_DURATION)
         
         pause_stats = {
-            "count": len(pause_segments),
-            "total_duration": sum(p["duration"] for p in pause_segments),
-            "average_duration": np.mean([p["duration"] for p in pause_segments]) if pause_segments else 0.0,
-            "segments": pause_segments
+            **pause_summary(segments),
+            "segments": segments.to_dicts()
         }
         
         logger.info(f"Pause analysis completed: {pause_stats['count']} pauses, total duration={pause_stats['total_duration']:.2f}s")
@@ -258,59 +209,142 @@ def calculate_wpm(transcript_data: Dict[str, Any], audio_duration: float) -> Dic
         if not transcript_data or "text" not in transcript_data:
             return {"current": 0, "average": 0, "timeline": []}
         
-        text = transcript_data["text"]
-        words = text.split()
-        word_count = len(words)
+        # Timed words from the ASR worker; plain text only gives the overall rate
+        words = word_times(transcript_data.get("words") or [])
+        word_count = len(words) or len(transcript_data["text"].split())
         
         # Calculate WPM
         wpm = (word_count / audio_duration) * 60 if audio_duration > 0 else 0
         
-        # Create timeline (simplified - could be more sophisticated)
-        timeline = [
-            {"timestamp": 0.0, "value": wpm},
-            {"timestamp": audio_duration / 2, "value": wpm},
-            {"timestamp": audio_duration, "value": wpm}
-        ]
-        
         wpm_stats = {
             "current": float(wpm),
             "average": float(wpm),
-            "timeline": timeline
+            "articulation_rate": overall_articulation_rate(words),
+            "window_seconds": WPM_WINDOW_SECONDS,
+            "timeline": [],
+            "articulation_timeline": []
         }
         
-        logger.info(f"WPM calculation completed: {wpm:.1f} WPM")
+        if len(words) and audio_duration > 0:
+            # Sliding-window pace, one vectorized pass over word start times
+            pace = windowed_pace(words, audio_duration, WPM_WINDOW_SECONDS, WPM_HOP_SECONDS)
+            wpm_stats["timeline"] = encode_timeline(pace["wpm"], 0.0, WPM_HOP_SECONDS)
+            wpm_stats["articulation_timeline"] = encode_timeline(pace["articulation_rate"], 0.0, WPM_HOP_SECONDS)
+            wpm_stats["min"] = float(np.min(pace["wpm"]))
+            wpm_stats["max"] = float(np.max(pace["wpm"]))
+        
+        logger.info(f"WPM calculation completed: {wpm:.1f} WPM, articulation {wpm_stats['articulation_rate']:.1f} WPM")
         return wpm_stats
         
     except Exception as e:
         logger.error(f"WPM calculation failed: {e}")
         return {"current": 0, "average": 0, "timeline": []}
 
-async def analyze_prosody(audio_path: str, transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Perform comprehensive prosody analysis"""
+# Independent audio analyzers dispatched to the executor; each takes the shared FeatureContext first
+ANALYZERS = {
+    "f0": analyze_f0,
+    "rms": analyze_rms,
+    "jitter_shimmer": analyze_jitter_shimmer,
+    "pauses": analyze_pauses,
+}
+ANALYZER_TIMEOUTS = {"jitter_shimmer": JITTER_TIMEOUT}
+ANALYZER_DEFAULTS = {"jitter_shimmer": JITTER_SHIMMER_DEFAULTS}
+
+def run_shared_analyzers(names, audio: SharedAudio, args: Dict[str, tuple], pitch=None, return_pitch: bool = False):
+    """Pool-process entry point: run analyzers that share features over one context on PCM in shared memory
+    
+    Returns ({name: result}, {stage: seconds}, pitch), the pitch track only when
+    ``return_pitch`` so a later task can reuse it instead of recomputing it.
+    """
+    with attach_audio(audio) as y:
+        ctx = FeatureContext(y, SAMPLE_RATE, pitch=pitch)
+        results = {}
+        for name in names:
+            with ctx.timed(f"{name}.analyze"):
+                results[name] = ANALYZERS[name](ctx, *args.get(name, ()))
+        pitch = ctx.pitch if return_pitch else None
+        timings = ctx.timings
+        del ctx
+    return results, timings, pitch
+
+def run_context_analyzer(name: str, ctx: FeatureContext, *args):
+    """Thread entry point: run one analyzer over the caller's prepared context"""
+    with ctx.timed(f"{name}.analyze"):
+        return ANALYZERS[name](ctx, *args), {}
+
+async def run_process_analyzers(ctx: FeatureContext, audio: SharedAudio, extra_args: Dict[str, tuple]) -> Dict[str, Any]:
+    """Pool tasks grouped by shared features, so each is computed once per analysis
+    
+    RMS and pauses share frame RMS in one task. F0 computes the pitch track and
+    hands it to jitter/shimmer, which runs as its own task in the executor's
+    isolated pool so its timeout, defaults and pool recycling apply to it alone.
+    """
+    async def run_task(name, names, timeout, default=None, pitch=None, return_pitch=False):
+        results, timings, pitch = await analyzer_executor.run(
+            name, run_shared_analyzers, names, audio, extra_args, pitch, return_pitch, timeout=timeout, default=default,
+        )
+        for stage, seconds in timings.items():
+            ctx.timings[f"{name}.{stage}"] = seconds
+        return results, pitch
+    
+    async def voice():
+        results, pitch = await run_task("f0", ("f0",), ANALYZER_TIMEOUT, return_pitch=True)
+        default = ({"jitter_shimmer": dict(JITTER_SHIMMER_DEFAULTS)}, {}, None)
+        jitter, _ = await run_task("jitter_shimmer", ("jitter_shimmer",), JITTER_TIMEOUT, default, pitch=pitch)
+        return {**results, **jitter}
+    
+    energy, voice_results = await asyncio.gather(run_task("energy", ("rms", "pauses"), ANALYZER_TIMEOUT), voice())
+    return {**energy[0], **voice_results}
+
+async def run_analyzers(ctx: FeatureContext, transcript_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run every analyzer concurrently, substituting defaults for those that time out"""
+    extra_args = {"pauses": (transcript_data,)}
+    
+    if analyzer_executor.mode == "process":
+        with share_audio(ctx.y) as audio:
+            return await run_process_analyzers(ctx, audio, extra_args)
+    
+    async def run_one(name):
+        default = ANALYZER_DEFAULTS.get(name)
+        result, _ = await analyzer_executor.run(
+            name, run_context_analyzer, name, ctx, *extra_args.get(name, ()),
+            timeout=ANALYZER_TIMEOUTS.get(name, ANALYZER_TIMEOUT),
+            default=(dict(default), {}) if default is not None else None,
+        )
+        return name, result
+    
+    # Shared features first so concurrent analyzers don't each compute them; the point
+    # process stays with jitter/shimmer so a pathological one is covered by its timeout
+    await asyncio.to_thread(ctx.prepare, point_process=False)
+    results = await asyncio.gather(*(run_one(name) for name in ANALYZERS))
+    return dict(results)
+
+async def analyze_prosody(y: np.ndarray, transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Perform comprehensive prosody analysis on decoded 16 kHz mono PCM"""
     try:
-        # Load audio to get duration
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-        audio_duration = len(y) / sr
+        # Decode-once context: Sound, pitch, point process and frame RMS are built once per worker
+        ctx = FeatureContext(y, SAMPLE_RATE)
+        audio_duration = ctx.duration
         
-        # Perform all analyses
-        f0_stats = analyze_f0(audio_path)
-        rms_stats = analyze_rms(audio_path)
-        jitter_shimmer_stats = analyze_jitter_shimmer(audio_path)
-        pause_stats = analyze_pauses(audio_path, transcript_data)
-        wpm_stats = calculate_wpm(transcript_data, audio_duration)
+        # Audio analyzers run concurrently off the event loop
+        with ctx.timed("analyzers"):
+            results = await run_analyzers(ctx, transcript_data)
+        with ctx.timed("wpm"):
+            wpm_stats = calculate_wpm(transcript_data, audio_duration)
         
         # Combine all results
         prosody_data = {
-            "f0": f0_stats,
-            "rms": rms_stats,
-            "jitter_shimmer": jitter_shimmer_stats,
-            "pauses": pause_stats,
+            "f0": results["f0"],
+            "rms": results["rms"],
+            "jitter_shimmer": results["jitter_shimmer"],
+            "pauses": results["pauses"],
             "wpm": wpm_stats,
             "audio_duration": audio_duration,
+            "timings": ctx.timings,
             "analysis_timestamp": asyncio.get_event_loop().time()
         }
         
-        logger.info("Prosody analysis completed successfully")
+        logger.info(f"Prosody analysis completed successfully (timings: {ctx.timings})")
         return prosody_data
         
     except Exception as e:
@@ -333,9 +367,159 @@ async def publish_result(session_id: str, result: Dict[str, Any]):
     except Exception as e:
         logger.error(f"Failed to publish prosody result: {e}")
 
-async def process_prosody_task(request: ProsodyAnalysisRequest):
+async def publish_partial(session_id: str, metrics: Dict[str, Any]):
+    """Publish rolling streaming metrics to NATS"""
+    try:
+        message = {
+            "session_id": session_id,
+            "type": "prosody_partial",
+            "data": metrics,
+            "timestamp": asyncio.get_event_loop().time()
+        }
+        
+        await nats_client.publish("prosody.partial", json.dumps(message).encode())
+        
+    except Exception as e:
+        logger.error(f"Failed to publish partial prosody metrics: {e}")
+
+def serialize_result(result: Dict[str, Any], timeline_format: str = "columnar"):
+    """Timeline pyramids, stored result and JSON payload for one prosody result"""
+    # Precompute min/max/mean pyramids for chart queries before timelines are expanded
+    pyramids = build_pyramids(result)
+    
+    if timeline_format == "json":
+        result = expand_timelines(result)
+    return pyramids, result, json.dumps(result)
+
+async def store_result(session_id: str, result: Dict[str, Any], timeline_format: str = "columnar"):
+    """Store a prosody result and its timeline pyramids; returns the stored result and its size"""
+    pyramids, result, payload = await asyncio.to_thread(serialize_result, result, timeline_format)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(f"prosody_timeline:{session_id}", mapping=pyramids)
+        pipe.set(f"prosody:{session_id}", payload)
+        await pipe.execute()
+    logger.info(f"Prosody payload for session {session_id}: {len(payload) / 1024:.1f} KiB ({timeline_format} timelines)")
+    return result, len(payload)
+
+# coaching.metrics metric_type and metadata per result timeline, following the seed data naming
+METRIC_TYPES = {
+    "f0": ("pitch", {"unit": "hz"}),
+    "rms": ("volume", {"unit": "db"}),
+    "wpm": ("wpm", {"window_size": WPM_WINDOW_SECONDS}),
+}
+
+def metric_series(session_id: str, result: Dict[str, Any], recorded_at: datetime) -> List[MetricSeries]:
+    """Pitch, volume and WPM series (bucket means at METRICS_SINK_RESOLUTION) and pause durations for the metric store"""
+    series = []
+    for metric in TIMELINE_METRICS:
+        timeline = (result.get(metric) or {}).get("timeline")
+        if not is_columnar(timeline):
+            continue
+        if timeline["hop"] < METRICS_SINK_RESOLUTION:
+            level = build_level(timeline, METRICS_SINK_RESOLUTION)
+            values = decode_values(level, "mean")
+        else:
+            level, values = timeline, decode_values(timeline)
+        metric_type, metadata = METRIC_TYPES[metric]
+        series.append(MetricSeries(session_id, metric_type, recorded_at, timeline_times(level), values.astype(np.float64),
+                                   {**metadata, "resolution": level["hop"]}))
+    
+    segments = (result.get("pauses") or {}).get("segments") or []
+    if segments:
+        series.append(MetricSeries(
+            session_id, "pause", recorded_at,
+            np.array([segment["start"] for segment in segments]),
+            np.array([segment["duration"] for segment in segments]),
+            {"unit": "s"},
+        ))
+    return series
+
+async def sink_metrics(session_id: str, result: Dict[str, Any], recorded_at: Optional[datetime] = None):
+    """Replace a session's series in the metric store
+    
+    Rows are timed from the session start: ``recorded_at`` when the caller knows
+    it, else the start the store already has for the session (its creation time,
+    or the time base of an earlier analysis), so re-analysis keeps the same time
+    base. Only a session the store has never seen is timed as ending now.
+    """
+    if metrics_sink is None:
+        return
+    try:
+        recorded_at = recorded_at or await metrics_sink.session_start(session_id)
+        if recorded_at is None:
+            recorded_at = datetime.now(timezone.utc) - timedelta(seconds=result.get("audio_duration", 0.0))
+        series = await asyncio.to_thread(metric_series, session_id, result, recorded_at)
+        await metrics_sink.submit(session_id, series)
+    except Exception as e:
+        logger.error(f"Failed to queue metric series for session {session_id}: {e}")
+
+def summary_to_result(summary: Dict[str, Any], transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Complete an incremental analyzer summary into the analyze_prosody schema"""
+    return {
+        "f0": summary["f0"],
+        "rms": summary["rms"],
+        "jitter_shimmer": summary["jitter_shimmer"],
+        "pauses": summary["pauses"],
+        "wpm": calculate_wpm(transcript_data, summary["audio_duration"]),
+        "audio_duration": summary["audio_duration"],
+        "timings": summary["timings"],
+        "analysis_timestamp": asyncio.get_event_loop().time()
+    }
+
+async def analyze_prosody_chunked(audio, transcript_data: Optional[Dict[str, Any]] = None):
+    """Bounded-memory analysis of a long recording (file path or decoded PCM); returns (result, memory statistics)"""
+    analyze = analyze_file_chunked if isinstance(audio, str) else analyze_pcm_chunked
+    summary = await asyncio.to_thread(analyze, audio, PROSODY_RSS_BUDGET_MB * 1024 * 1024)
+    memory = summary.pop("memory")
+    logger.info(f"Chunked prosody analysis completed: {summary['audio_duration']:.0f}s in {memory['blocks']} blocks, peak RSS {memory['peak_rss_mb']} MB")
+    return summary_to_result(summary, transcript_data), memory
+
+async def analyze_audio(
+    transcript_data: Optional[Dict[str, Any]],
+    chunked: Optional[bool] = None,
+    y: Optional[np.ndarray] = None,
+    audio_path: Optional[str] = None,
+    audio_url: Optional[str] = None,
+    cache: bool = True,
+):
+    """Analyze cached PCM ``y`` or a downloaded file; returns (result, memory statistics)
+    
+    Recordings whose whole-file analysis would grow RSS past the per-analysis
+    budget are streamed in blocks, whether they come from the node cache or from
+    a fresh download.
+    With ``cache=False`` a decoded download is not added to the node cache.
+    """
+    budget_bytes = PROSODY_RSS_BUDGET_MB * 1024 * 1024
+    if chunked is None:
+        if y is not None:
+            chunked = exceeds_budget(len(y), budget_bytes)
+        else:
+            chunked = await asyncio.to_thread(needs_chunking, audio_path, budget_bytes)
+    if chunked:
+        return await analyze_prosody_chunked(y if y is not None else audio_path, transcript_data)
+    
+    # Peak growth of this task (worker process plus analyzer pool) over its starting baseline, sampled throughout
+    with RssTracker(analyzer_executor.worker_pids) as tracker:
+        if y is None and cache:
+            y, _ = await asyncio.to_thread(audio_cache.get_or_decode, audio_path, audio_url)
+        elif y is None:
+            y = await asyncio.to_thread(decode_pcm, audio_path)
+        result = await analyze_prosody(y, transcript_data)
+    return result, {"mode": "full", **tracker.stats(), "budget_mb": PROSODY_RSS_BUDGET_MB}
+
+async def finalize_stream(session_id: str, analyzer: StreamingProsodyAnalyzer, started_at: datetime,
+                          transcript_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Flush a streaming session into the analyze_prosody schema, then store and publish it"""
+    summary = await asyncio.to_thread(analyzer.finalize)
+    result = summary_to_result(summary, transcript_data)
+    await store_result(session_id, result)
+    await sink_metrics(session_id, result, started_at)
+    await publish_result(session_id, result)
+    logger.info(f"Streaming prosody finalized for session {session_id}: {result['audio_duration']:.1f}s")
+    return result
+
+async def process_prosody_task(request: ProsodyAnalysisRequest, task_id: str):
     """Background task to process prosody analysis"""
-    task_id = str(uuid.uuid4())
     
     try:
         # Update task status
@@ -345,9 +529,10 @@ async def process_prosody_task(request: ProsodyAnalysisRequest):
             "message": "Downloading audio..."
         }))
         
-        # Download audio
-        audio_path = await download_audio(request.audio_url)
-        
+        # Already decoded on this node (e.g. by the ASR worker): memory-mapped, no second download or decode
+        cached = audio_cache.cached(request.audio_url)
+        y = cached[0] if cached else None
+        audio_path = None if cached else await download_audio(request.audio_url)
         try:
             # Update status
             await redis_client.set(f"prosody_task:{task_id}", json.dumps({
@@ -356,30 +541,32 @@ async def process_prosody_task(request: ProsodyAnalysisRequest):
                 "message": "Analyzing prosody features..."
             }))
             
-            # Perform prosody analysis
-            result = await analyze_prosody(audio_path, request.transcript_data)
-            
-            # Store result in Redis
-            await redis_client.set(f"prosody:{request.session_id}", json.dumps(result))
-            
-            # Update task status
-            await redis_client.set(f"prosody_task:{task_id}", json.dumps({
-                "status": "completed",
-                "session_id": request.session_id,
-                "message": "Prosody analysis completed",
-                "result": result
-            }))
-            
-            # Publish result to NATS
-            await publish_result(request.session_id, result)
-            
-            logger.info(f"Prosody task completed for session: {request.session_id}")
-            
+            # Perform prosody analysis (streamed in blocks when over the RSS budget)
+            result, memory = await analyze_audio(request.transcript_data, request.chunked, y, audio_path, request.audio_url)
         finally:
-            # Clean up temporary file
-            if os.path.exists(audio_path):
+            if audio_path and os.path.exists(audio_path):
                 os.unlink(audio_path)
-                
+        
+        # Store result and timeline pyramids in Redis
+        # Queue the metric series from the columnar result, before timelines are expanded for storage
+        await sink_metrics(request.session_id, result, request.recorded_at)
+        result, payload_bytes = await store_result(request.session_id, result, request.timeline_format)
+        
+        # Update task status
+        await redis_client.set(f"prosody_task:{task_id}", json.dumps({
+            "status": "completed",
+            "session_id": request.session_id,
+            "message": "Prosody analysis completed",
+            "payload_bytes": payload_bytes,
+            "memory": memory,
+            "result": result
+        }))
+        
+        # Publish result to NATS
+        await publish_result(request.session_id, result)
+        
+        logger.info(f"Prosody task completed for session: {request.session_id}")
+        
     except Exception as e:
         logger.error(f"Prosody task failed for session {request.session_id}: {e}")
         
@@ -390,10 +577,70 @@ async def process_prosody_task(request: ProsodyAnalysisRequest):
             "message": str(e)
         }))
 
+async def process_batch_task(request: BatchProsodyRequest, batch_id: str):
+    """Background task running a batch through the download -> analyze -> write pipeline"""
+    progress = BatchProgress(batch_id, len(request.items))
+    
+    async def fetch(item: BatchItem):
+        # Reuse PCM live traffic already decoded, but never add archive audio to the node cache
+        cached = audio_cache.cached(item.audio_url)
+        if cached:
+            return cached[0], None
+        return None, await download_audio(item.audio_url)
+    
+    async def analyze(item: BatchItem, audio) -> Dict[str, Any]:
+        y, audio_path = audio
+        try:
+            # Same RSS-budget chunking decision as /process
+            result, _ = await analyze_audio(item.transcript_data, None, y, audio_path, item.audio_url, cache=False)
+            return result
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.unlink(audio_path)
+    
+    async def write(results, progress: BatchProgress):
+        # One round trip per group: every result, its pyramids and the progress document
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for item, result in results:
+                pyramids, _, payload = await asyncio.to_thread(serialize_result, result, request.timeline_format)
+                pipe.hset(f"prosody_timeline:{item.session_id}", mapping=pyramids)
+                pipe.set(f"prosody:{item.session_id}", payload)
+            pipe.set(f"prosody_batch:{batch_id}", json.dumps(progress.to_dict()))
+            await pipe.execute()
+        for item, result in results:
+            await sink_metrics(item.session_id, result, item.recorded_at)
+        if request.publish:
+            for item, result in results:
+                await publish_result(item.session_id, result)
+    
+    try:
+        await redis_client.set(f"prosody_batch:{batch_id}", json.dumps(progress.to_dict()))
+        await run_batch(
+            request.items, fetch, analyze, write, progress,
+            session_id=lambda item: item.session_id,
+            prefetch=BATCH_PREFETCH,
+            download_concurrency=BATCH_DOWNLOAD_CONCURRENCY,
+            workers=BATCH_CONCURRENCY,
+            write_batch=BATCH_WRITE_SIZE,
+        )
+        summary = progress.to_dict()
+        logger.info(f"Prosody batch {batch_id} finished: {summary['completed']}/{summary['total']} sessions, "
+                    f"{summary['sessions_per_minute']} sessions/min, {summary['audio_hours_per_hour']} audio-hours/hour")
+    except Exception as e:
+        logger.error(f"Prosody batch {batch_id} failed: {e}")
+        progress.status = "failed"
+        summary = {**progress.to_dict(), "message": str(e)}
+    
+    await redis_client.set(f"prosody_batch:{batch_id}", json.dumps(summary))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize connections on startup"""
-    global redis_client, nats_client
+    global redis_client, nats_client, audio_cache, analyzer_executor, metrics_sink
+    
+    # Analyzer pool (spawned before any connections are opened)
+    analyzer_executor = AnalyzerExecutor(PROSODY_EXECUTOR, PROSODY_WORKERS, ("jitter_shimmer",), JITTER_WORKERS)
+    logger.info(f"Prosody analyzers: {PROSODY_EXECUTOR} executor, {PROSODY_WORKERS} workers")
     
     # Connect to Redis
     redis_client = redis.from_url(REDIS_URL)
@@ -404,10 +651,24 @@ async def startup_event():
     nats_client = NATS()
     await nats_client.connect(NATS_URL)
     logger.info("Connected to NATS")
+    
+    # Node-local decoded-audio cache shared with the ASR worker
+    audio_cache = SharedAudioCache()
+    
+    # Bulk metric series writer (TimescaleDB, or SQLite locally); off unless METRICS_SINK_URL is set
+    metrics_sink = metrics_sink_from_env()
+    if metrics_sink:
+        await metrics_sink.start()
+        logger.info(f"Metric sink started: {type(metrics_sink.backend).__name__}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown"""
+    await media_fetcher.close()
+    if metrics_sink:
+        await metrics_sink.close()
+    if analyzer_executor:
+        analyzer_executor.shutdown()
     if redis_client:
         await redis_client.close()
     if nats_client:
@@ -420,7 +681,7 @@ async def process_prosody(request: ProsodyAnalysisRequest, background_tasks: Bac
         task_id = str(uuid.uuid4())
         
         # Add task to background processing
-        background_tasks.add_task(process_prosody_task, request)
+        background_tasks.add_task(process_prosody_task, request, task_id)
         
         return ProsodyAnalysisResponse(
             session_id=request.session_id,
@@ -433,6 +694,30 @@ async def process_prosody(request: ProsodyAnalysisRequest, background_tasks: Bac
         logger.error(f"Failed to start prosody analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/process/batch", response_model=BatchProsodyResponse)
+async def process_prosody_batch(request: BatchProsodyRequest, background_tasks: BackgroundTasks):
+    """Queue prosody (re-)analysis for many archived sessions"""
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    
+    batch_id = str(uuid.uuid4())
+    background_tasks.add_task(process_batch_task, request, batch_id)
+    
+    return BatchProsodyResponse(
+        batch_id=batch_id,
+        total=len(request.items),
+        status="accepted",
+        message=f"Prosody batch of {len(request.items)} sessions started"
+    )
+
+@app.get("/process/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get progress and throughput of a prosody batch"""
+    batch_data = await redis_client.get(f"prosody_batch:{batch_id}")
+    if not batch_data:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return json.loads(batch_data)
+
 @app.get("/status/{task_id}")
 async def get_task_status(task_id: str):
     """Get status of prosody processing task"""
@@ -447,23 +732,129 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/prosody/{session_id}")
-async def get_prosody(session_id: str):
-    """Get prosody analysis result for session"""
+async def get_prosody(session_id: str, timeline_format: str = "columnar"):
+    """Get prosody analysis result for session (``?timeline_format=json`` expands timelines to points)"""
     try:
         prosody_data = await redis_client.get(f"prosody:{session_id}")
         if prosody_data:
-            return json.loads(prosody_data)
+            prosody_data = json.loads(prosody_data)
+            return expand_timelines(prosody_data) if timeline_format == "json" else prosody_data
         else:
             raise HTTPException(status_code=404, detail="Prosody analysis not found")
     except Exception as e:
         logger.error(f"Failed to get prosody analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/prosody/{session_id}/timeline")
+async def get_prosody_timeline(
+    session_id: str,
+    metric: str = "f0",
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    resolution: Optional[str] = None,
+    timeline_format: str = "columnar",
+):
+    """Get one metric's timeline window at a pyramid level (seconds or "raw"; default picks by window size)"""
+    key = f"prosody_timeline:{session_id}"
+    meta = await redis_client.hget(key, "meta")
+    if not meta:
+        raise HTTPException(status_code=404, detail="Prosody timeline not found")
+    meta = json.loads(meta)
+    
+    if resolution is None:
+        levels = meta["levels"]
+        if isinstance(levels, dict):
+            # Levels are per metric: none finer than the metric's own hop is built
+            levels = levels.get(metric, [])
+        span = (meta["duration"] if end is None else end) - (start or 0.0)
+        fitting = [level for level in levels if span / level <= TIMELINE_MAX_POINTS]
+        resolution = f"{min(fitting) if fitting else max(levels):g}" if levels else "raw"
+    elif resolution != "raw":
+        try:
+            resolution = f"{float(resolution):g}"
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid resolution: {resolution}")
+    
+    level = await redis_client.hget(key, f"{metric}:{resolution}")
+    if not level:
+        raise HTTPException(status_code=404, detail=f"No {metric} timeline at resolution {resolution}")
+    
+    window = slice_level(json.loads(level), start, end)
+    return {
+        "session_id": session_id,
+        "metric": metric,
+        "resolution": resolution,
+        "timeline": level_to_points(window) if timeline_format == "json" else window
+    }
+
+@app.get("/prosody/{session_id}/metrics/minute")
+async def get_prosody_minute_aggregates(session_id: str):
+    """Per-minute mean/min/max/count of each stored metric series, minute 0 being the first minute of the session"""
+    if metrics_sink is None:
+        raise HTTPException(status_code=404, detail="Metric sink is not configured")
+    try:
+        aggregates = await metrics_sink.aggregate_per_minute(session_id)
+    except Exception as e:
+        logger.error(f"Failed to aggregate metrics for session {session_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"session_id": session_id, "aggregates": aggregates}
+
+@app.websocket("/stream/{session_id}")
+async def stream_prosody(websocket: WebSocket, session_id: str):
+    """Realtime prosody over binary frames of 16 kHz mono s16le PCM
+    
+    Rolling metrics are sent back and published on prosody.partial. A text frame
+    {"type": "finalize", "transcript_data": {...}} ends the stream with the full result.
+    """
+    await websocket.accept()
+    analyzer = StreamingProsodyAnalyzer(window_seconds=STREAM_WINDOW_SECONDS, emit_interval=STREAM_EMIT_SECONDS)
+    started_at = datetime.now(timezone.utc)
+    logger.info(f"Streaming prosody started for session: {session_id}")
+    finalized = False
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                pcm = np.frombuffer(message["bytes"], dtype="<i2").astype(np.float32) / 32768.0
+                partial = await asyncio.to_thread(analyzer.push, pcm)
+                if partial:
+                    await publish_partial(session_id, partial)
+                    await websocket.send_json({"type": "partial", "data": partial})
+            
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "finalize":
+                    finalized = True
+                    result = await finalize_stream(session_id, analyzer, started_at, control.get("transcript_data"))
+                    await websocket.send_json({"type": "final", "data": result})
+                    await websocket.close()
+                    return
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Streaming prosody failed for session {session_id}: {e}")
+    
+    # Client left without finalizing: keep what was analyzed
+    if analyzer.samples_received and not finalized:
+        try:
+            await finalize_stream(session_id, analyzer, started_at)
+        except Exception as e:
+            logger.error(f"Failed to finalize streaming prosody for session {session_id}: {e}")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
+        "downloads": media_fetcher.metrics(),
+        "audio_cache": audio_cache.stats() if audio_cache else None,
+        "analyzers": analyzer_executor.stats() if analyzer_executor else None,
+        "metrics_sink": metrics_sink.stats() if metrics_sink else None,
         "redis_connected": redis_client is not None,
         "nats_connected": nats_client is not None
     }
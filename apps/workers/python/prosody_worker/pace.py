@@ -0,0 +1,86 @@
+"""
+Speaking Pace - Windowed WPM and articulation rate from ASR word timestamps
+Window word counts come from searchsorted over sorted word starts, and speaking
+time from a cumulative sum over word intervals, so every window is computed in
+one vectorized pass.
+"""
+
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+
+from pauses import MIN_PAUSE_DURATION
+
+WPM_WINDOW = 30.0  # seconds
+WPM_HOP = 5.0
+
+
+class WordTimes(NamedTuple):
+    """Sorted word start/end times (seconds)"""
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def word_times(words: List[Dict[str, Any]]) -> WordTimes:
+    """Start/end arrays for the words that carry timestamps"""
+    timed = [(w["start"], w.get("end", w["start"])) for w in words if w.get("start") is not None]
+    if not timed:
+        empty = np.empty(0, dtype=np.float64)
+        return WordTimes(empty, empty)
+    times = np.array(sorted(timed), dtype=np.float64)
+    return WordTimes(times[:, 0], np.maximum(times[:, 1], times[:, 0]))
+
+
+def speech_intervals(words: WordTimes, min_pause: float = MIN_PAUSE_DURATION) -> np.ndarray:
+    """Word intervals with gaps shorter than ``min_pause`` (and overlaps) absorbed into speech"""
+    ends = words.ends.copy()
+    if len(words) > 1:
+        next_starts = words.starts[1:]
+        ends[:-1] = np.where(next_starts - ends[:-1] < min_pause, next_starts, np.minimum(ends[:-1], next_starts))
+    return ends
+
+
+def speech_time_before(t: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Total speaking time in [0, t) for non-overlapping intervals"""
+    if len(starts) == 0:
+        return np.zeros_like(t)
+    durations = ends - starts
+    cumulative = np.concatenate(([0.0], np.cumsum(durations)))
+    k = np.searchsorted(starts, t, side="right")
+    previous = np.maximum(k - 1, 0)
+    partial = np.where(k > 0, np.clip(t - starts[previous], 0.0, durations[previous]), 0.0)
+    return cumulative[previous] + partial
+
+
+def windowed_pace(words: WordTimes, duration: float, window: float = WPM_WINDOW, hop: float = WPM_HOP) -> Dict[str, np.ndarray]:
+    """WPM and articulation rate over centred windows every ``hop`` seconds
+
+    Windows are clipped to the recording, so edge windows average over their
+    actual span. Articulation rate divides by speaking time instead of window
+    length and is NaN where a window holds no speech.
+    """
+    centers = np.arange(0.0, duration + 1e-9, hop)
+    lo = np.clip(centers - window / 2, 0.0, duration)
+    hi = np.clip(centers + window / 2, 0.0, duration)
+    span = hi - lo
+
+    counts = np.searchsorted(words.starts, hi, side="left") - np.searchsorted(words.starts, lo, side="left")
+    speech_ends = speech_intervals(words)
+    speaking = speech_time_before(hi, words.starts, speech_ends) - speech_time_before(lo, words.starts, speech_ends)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wpm = np.where(span > 0, counts / span * 60, 0.0)
+        articulation = np.where(speaking > 0, counts / speaking * 60, np.nan)
+
+    return {"centers": centers, "wpm": wpm, "articulation_rate": articulation}
+
+
+def overall_articulation_rate(words: WordTimes) -> float:
+    """Words per minute of speaking time over the whole recording"""
+    if len(words) == 0:
+        return 0.0
+    speaking = float(np.sum(speech_intervals(words) - words.starts))
+    return len(words) / speaking * 60 if speaking > 0 else 0.0
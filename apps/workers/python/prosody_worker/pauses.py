@@ -0,0 +1,57 @@
+"""
+Pause Segmentation - Vectorized run-length detection over frame masks
+Finds pause runs with np.diff on the padded mask instead of a per-frame Python loop.
+"""
+
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+
+from workers.runs import mask_runs
+
+MIN_PAUSE_DURATION = 0.1  # 100ms
+
+
+class PauseSegments(NamedTuple):
+    """Array-backed pause segments (seconds)"""
+    starts: np.ndarray
+    ends: np.ndarray
+    durations: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def to_dicts(self) -> List[Dict[str, float]]:
+        return [
+            {"start": start, "end": end, "duration": duration}
+            for start, end, duration in zip(self.starts.tolist(), self.ends.tolist(), self.durations.tolist())
+        ]
+
+
+def find_pause_segments(pause_mask: np.ndarray, times: np.ndarray, min_duration: float = MIN_PAUSE_DURATION) -> PauseSegments:
+    """Group consecutive pause frames into segments longer than ``min_duration``
+
+    A run ends at the timestamp of the first non-pause frame; a run that reaches
+    the end of the audio ends at the last frame's timestamp.
+    """
+    if len(pause_mask) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return PauseSegments(empty, empty, empty)
+
+    start_idx, end_idx = mask_runs(np.asarray(pause_mask, dtype=bool))
+    start_times = times[start_idx]
+    end_times = np.append(times, times[-1])[end_idx]
+    durations = end_times - start_times
+
+    keep = durations > min_duration
+    return PauseSegments(start_times[keep], end_times[keep], durations[keep])
+
+
+def pause_summary(segments: PauseSegments) -> Dict[str, Any]:
+    """Count/total/average statistics in the analyze_pauses output schema"""
+    durations = segments.durations.tolist()
+    return {
+        "count": len(segments),
+        "total_duration": sum(durations),
+        "average_duration": np.mean(durations) if durations else 0.0,
+    }
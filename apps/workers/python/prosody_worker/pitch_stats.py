@@ -0,0 +1,86 @@
+"""
+Pitch Statistics - NumPy reductions over the Praat pitch array
+Robust F0 summaries (percentiles, semitone range and spread) and per-phrase
+contour slopes, all computed from one voiced mask and one semitone conversion
+with no per-frame Python objects.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+PHRASE_GAP = 0.3        # unvoiced seconds that separate phrases
+MIN_PHRASE_FRAMES = 10  # voiced frames needed for a slope
+
+
+def semitones(f0: np.ndarray, reference: float) -> np.ndarray:
+    return 12 * np.log2(f0 / reference)
+
+
+def phrase_slopes(times: np.ndarray, st: np.ndarray, gap: float = PHRASE_GAP, min_frames: int = MIN_PHRASE_FRAMES) -> Dict[str, Any]:
+    """Least-squares contour slope (semitones/second) of every phrase of voiced frames
+
+    Per-phrase sums come from np.add.reduceat over the voiced frames, with time
+    measured from each phrase start to keep the sums well conditioned.
+    """
+    if len(times) == 0:
+        return {"count": 0, "mean_slope": 0.0, "rising_ratio": 0.0, "slopes": []}
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(times) > gap) + 1))
+    lengths = np.diff(np.append(starts, len(times)))
+    t = times - np.repeat(times[starts], lengths)
+
+    n = lengths.astype(np.float64)
+    sum_t = np.add.reduceat(t, starts)
+    sum_y = np.add.reduceat(st, starts)
+    sum_ty = np.add.reduceat(t * st, starts)
+    sum_tt = np.add.reduceat(t * t, starts)
+    denominator = n * sum_tt - sum_t ** 2
+
+    keep = (lengths >= min_frames) & (denominator > 0)
+    slopes = (n * sum_ty - sum_t * sum_y)[keep] / denominator[keep]
+    phrase_starts = times[starts][keep]
+    phrase_ends = times[starts + lengths - 1][keep]
+
+    return {
+        "count": int(keep.sum()),
+        "mean_slope": float(slopes.mean()) if len(slopes) else 0.0,
+        "rising_ratio": float((slopes > 0).mean()) if len(slopes) else 0.0,
+        "slopes": [
+            {"start": start, "end": end, "slope": slope}
+            for start, end, slope in zip(phrase_starts.tolist(), phrase_ends.tolist(), slopes.tolist())
+        ],
+    }
+
+
+def f0_statistics(f0: np.ndarray, times: np.ndarray) -> Dict[str, Any]:
+    """Summary statistics over voiced frames (F0 > 0) of a Praat pitch track"""
+    voiced = f0 > 0
+    voiced_f0 = f0[voiced]
+    if len(voiced_f0) == 0:
+        return {
+            "mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0, "median": 0.0,
+            "percentiles": {f"p{q}": 0.0 for q in PERCENTILES},
+            "range_semitones": 0.0, "std_semitones": 0.0,
+            "phrases": phrase_slopes(times[voiced], voiced_f0),
+        }
+
+    quantiles = np.percentile(voiced_f0, PERCENTILES)
+    percentiles = dict(zip((f"p{q}" for q in PERCENTILES), quantiles.tolist()))
+    median = percentiles["p50"]
+    # Semitones relative to the speaker's median, so spread is comparable across voices
+    st = semitones(voiced_f0, median)
+
+    return {
+        "mean": float(voiced_f0.mean()),
+        "std": float(voiced_f0.std()),
+        "min": float(voiced_f0.min()),
+        "max": float(voiced_f0.max()),
+        "median": median,
+        "percentiles": percentiles,
+        # 5th-95th percentile span, robust to octave errors at the extremes
+        "range_semitones": float(semitones(percentiles["p95"], percentiles["p5"])),
+        "std_semitones": float(st.std()),
+        "phrases": phrase_slopes(times[voiced], st),
+    }
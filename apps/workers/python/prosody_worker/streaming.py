@@ -0,0 +1,389 @@
+"""
+Streaming Prosody - Incremental F0, RMS and pause analysis over PCM chunks
+Accepts 16 kHz mono float32 chunks as they arrive. RMS frames and pitch blocks
+are computed as soon as enough samples (plus edge context) are buffered, rolling
+metrics come from fixed-size ring buffers, and session totals from running
+accumulators, so memory stays bounded however long the session runs. Only the
+downsampled timelines grow with the session (float32 per ``timeline_hop``).
+"""
+
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import numpy as np
+import parselmouth
+
+from features import FRAME_LENGTH, HOP_LENGTH, PITCH_CEILING, PITCH_FLOOR, SAMPLE_RATE
+from pauses import MIN_PAUSE_DURATION
+from pitch_stats import f0_statistics
+from timeline import decode_values, encode_timeline, timeline_times
+from voice_quality import VOICE_QUALITY_FIELDS, voice_measures
+from workers.runs import mask_runs
+
+WINDOW_SECONDS = 10.0    # rolling metrics window
+EMIT_INTERVAL = 1.0      # seconds of audio between partial snapshots
+PITCH_BLOCK = 1.0        # seconds of audio per Praat pitch call
+PITCH_MARGIN = 0.1       # context on each side of a pitch block (> 3 periods at PITCH_FLOOR)
+TIMELINE_HOP = 0.1       # bucket size of the finalized timelines
+MAX_PAUSE_SEGMENTS = 10000
+PAUSE_PERCENTILE = 20
+
+MIN_VOICED_FRAMES = 10  # voiced frames a pitch block needs before its voice report counts
+
+
+class RingBuffer:
+    """Fixed-capacity float ring; ``values()`` returns the contents oldest first"""
+
+    def __init__(self, capacity: int):
+        self.data = np.full(capacity, np.nan, dtype=np.float32)
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0
+
+    def extend(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float32)[-self.capacity:]
+        n = len(values)
+        end = self.head + n
+        if end <= self.capacity:
+            self.data[self.head:end] = values
+        else:
+            split = self.capacity - self.head
+            self.data[self.head:] = values[:split]
+            self.data[:n - split] = values[split:]
+        self.head = end % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def values(self) -> np.ndarray:
+        if self.size < self.capacity:
+            return self.data[:self.size]
+        return np.concatenate((self.data[self.head:], self.data[:self.head]))
+
+
+class RunningStats:
+    """Mean/std/min/max merged batch by batch (Chan et al. parallel Welford update)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "RunningStats"):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {"mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0}
+        return {"mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+
+
+class TimelineAccumulator:
+    """Bucket means of a series whose timestamps only move forward, stored as float32"""
+
+    def __init__(self, hop: float = TIMELINE_HOP):
+        self.hop = hop
+        self.values = array("f")
+        self._sums = np.zeros(0)
+        self._counts = np.zeros(0)
+
+    def add(self, times: np.ndarray, values: np.ndarray):
+        if len(times) == 0:
+            return
+        present = ~np.isnan(values)
+        # Small epsilon so frames that land exactly on a bucket edge are not lost to rounding
+        buckets = np.floor(np.asarray(times) / self.hop + 1e-6).astype(np.int64) - len(self.values)
+        buckets = np.maximum(buckets, 0)
+        size = max(int(buckets.max()) + 1, len(self._sums))
+        sums = np.bincount(buckets[present], weights=values[present], minlength=size).astype(np.float64)
+        counts = np.bincount(buckets[present], minlength=size).astype(np.float64)
+        sums[:len(self._sums)] += self._sums
+        counts[:len(self._counts)] += self._counts
+        # Every bucket before the newest one is complete
+        self._flush(sums[:-1], counts[:-1])
+        self._sums, self._counts = sums[-1:], counts[-1:]
+
+    def _flush(self, sums: np.ndarray, counts: np.ndarray):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.values.extend(np.where(counts > 0, sums / counts, np.nan).astype(np.float32).tolist())
+
+    def finish(self, duration: float) -> Dict[str, Any]:
+        self._flush(self._sums, self._counts)
+        self._sums, self._counts = np.zeros(0), np.zeros(0)
+        n_buckets = int(np.ceil(duration / self.hop - 1e-9))
+        values = np.frombuffer(self.values, dtype=np.float32)[:n_buckets]
+        if len(values) < n_buckets:
+            values = np.concatenate((values, np.full(n_buckets - len(values), np.nan, dtype=np.float32)))
+        # Bucket means are stamped at the bucket centre
+        return encode_timeline(values, self.hop / 2, self.hop)
+
+
+class StreamingProsodyAnalyzer:
+    """Incremental prosody analysis for one live session"""
+
+    def __init__(self, sr: int = SAMPLE_RATE, window_seconds: float = WINDOW_SECONDS,
+                 emit_interval: float = EMIT_INTERVAL, timeline_hop: float = TIMELINE_HOP):
+        self.sr = sr
+        self.window_seconds = window_seconds
+        self.emit_interval = emit_interval
+        self.frame_length = int(FRAME_LENGTH * sr)
+        self.hop_length = int(HOP_LENGTH * sr)
+        self.pitch_block = int(PITCH_BLOCK * sr)
+        self.pitch_margin = int(PITCH_MARGIN * sr)
+        self.samples_received = 0
+        self.timings: Dict[str, float] = {}
+
+        # RMS framing state; the leading half frame of zeros matches librosa's centred frames
+        self._rms_pending = np.zeros(self.frame_length // 2, dtype=np.float32)
+        self._rms_frames = 0
+
+        # Pitch block state: buffered samples starting at global sample index _pitch_buffer_start
+        self._pitch_buffer = np.zeros(0, dtype=np.float32)
+        self._pitch_buffer_start = 0
+        self._pitch_next = 0
+
+        # Rolling windows (one value per 10 ms frame)
+        window_frames = int(round(window_seconds / HOP_LENGTH))
+        self.rms_window = RingBuffer(window_frames)
+        self.f0_window = RingBuffer(window_frames)
+
+        # Session totals
+        self.f0_stats = RunningStats()
+        self.rms_stats = RunningStats()
+        self.f0_timeline = TimelineAccumulator(timeline_hop)
+        self.rms_timeline = TimelineAccumulator(timeline_hop)
+        self.voice_sums = {name: 0.0 for name in VOICE_QUALITY_FIELDS}
+        self.voice_weights = {name: 0 for name in VOICE_QUALITY_FIELDS}
+
+        # Pause tracking with a rolling threshold
+        self.pause_threshold: Optional[float] = None
+        self._pause_start: Optional[float] = None
+        self.pause_count = 0
+        self.pause_total = 0.0
+        self.pause_segments = deque(maxlen=MAX_PAUSE_SEGMENTS)
+
+        self._last_emit = 0.0
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = round(self.timings.get(stage, 0.0) + time.perf_counter() - started, 4)
+
+    @property
+    def duration(self) -> float:
+        return self.samples_received / self.sr
+
+    @property
+    def analyzed_until(self) -> float:
+        """Timestamp of the last RMS frame analyzed"""
+        return max(self._rms_frames - 1, 0) * self.hop_length / self.sr
+
+    def push(self, chunk: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Feed a chunk of PCM; returns a rolling snapshot whenever ``emit_interval`` of audio has passed"""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self.samples_received += len(chunk)
+        self._advance_rms(chunk)
+        with self.timed("pitch"):
+            self._advance_pitch(chunk)
+
+        if self.analyzed_until - self._last_emit >= self.emit_interval:
+            self._last_emit = self.analyzed_until
+            return self.snapshot()
+        return None
+
+    def _advance_rms(self, chunk: np.ndarray, final: bool = False):
+        with self.timed("rms"):
+            frames = self._frame_rms(chunk, final)
+        if frames is not None:
+            with self.timed("pauses"):
+                self._track_pauses(*frames)
+
+    def _frame_rms(self, chunk: np.ndarray, final: bool):
+        buffer = np.concatenate((self._rms_pending, chunk))
+        if final:
+            buffer = np.concatenate((buffer, np.zeros(self.frame_length // 2, dtype=np.float32)))
+        if len(buffer) < self.frame_length:
+            self._rms_pending = buffer
+            return None
+        n_frames = 1 + (len(buffer) - self.frame_length) // self.hop_length
+        if final:
+            # librosa emits 1 + n_samples // hop centred frames in total
+            n_frames = min(n_frames, 1 + self.samples_received // self.hop_length - self._rms_frames)
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.frame_length)[::self.hop_length][:n_frames]
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        self._rms_pending = buffer[n_frames * self.hop_length:]
+
+        times = (self._rms_frames + np.arange(n_frames)) * self.hop_length / self.sr
+        self._rms_frames += n_frames
+        rms_db = 20 * np.log10(rms + 1e-10)
+        self.rms_window.extend(rms_db)
+        self.rms_stats.update(rms_db)
+        self.rms_timeline.add(times, rms_db)
+        return times, rms_db
+
+    def _track_pauses(self, times: np.ndarray, rms_db: np.ndarray):
+        # Threshold follows the rolling window rather than the whole recording
+        self.pause_threshold = float(np.percentile(self.rms_window.values(), PAUSE_PERCENTILE))
+        starts, ends = mask_runs(rms_db < self.pause_threshold)
+
+        # A pause left open by the previous chunk either continues into this one or ends at its first frame
+        if self._pause_start is not None and (len(starts) == 0 or starts[0] > 0):
+            self._close_pause(float(times[0]))
+        for start, end in zip(starts, ends):
+            if not (start == 0 and self._pause_start is not None):
+                self._pause_start = float(times[start])
+            if end < len(times):
+                self._close_pause(float(times[end]))
+
+    def _close_pause(self, end: float):
+        duration = end - self._pause_start
+        if duration > MIN_PAUSE_DURATION:
+            self.pause_count += 1
+            self.pause_total += duration
+            self.pause_segments.append({"start": self._pause_start, "end": end, "duration": duration})
+        self._pause_start = None
+
+    def _advance_pitch(self, chunk: np.ndarray, final: bool = False):
+        self._pitch_buffer = np.concatenate((self._pitch_buffer, chunk))
+        total = self._pitch_buffer_start + len(self._pitch_buffer)
+        while self._pitch_next + self.pitch_block + self.pitch_margin <= total:
+            self._analyze_pitch_block(self._pitch_next, self._pitch_next + self.pitch_block, total)
+            self._pitch_next += self.pitch_block
+            drop = self._pitch_next - self.pitch_margin - self._pitch_buffer_start
+            if drop > 0:
+                self._pitch_buffer = self._pitch_buffer[drop:]
+                self._pitch_buffer_start += drop
+        if final and self._pitch_next < total:
+            self._analyze_pitch_block(self._pitch_next, total, total)
+            self._pitch_next = total
+
+    def _analyze_pitch_block(self, start: int, end: int, total: int):
+        segment_start = max(start - self.pitch_margin, 0)
+        segment_end = min(end + self.pitch_margin, total)
+        segment = self._pitch_buffer[segment_start - self._pitch_buffer_start:segment_end - self._pitch_buffer_start]
+        if len(segment) < 2 * self.pitch_margin:
+            return
+
+        sound = parselmouth.Sound(segment.astype(np.float64), sampling_frequency=self.sr, start_time=segment_start / self.sr)
+        pitch = sound.to_pitch(pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING)
+        times = pitch.xs()
+        keep = (times >= start / self.sr) & (times < end / self.sr)
+        f0 = pitch.selected_array["frequency"][keep]
+        f0 = np.where(f0 > 0, f0, np.nan)
+
+        self.f0_window.extend(f0)
+        self.f0_stats.update(f0)
+        self.f0_timeline.add(times[keep], f0)
+
+        voiced = int(np.count_nonzero(~np.isnan(f0)))
+        if voiced >= MIN_VOICED_FRAMES:
+            with self.timed("voice"):
+                self._accumulate_voice(sound, pitch, start / self.sr, end / self.sr, voiced)
+
+    def _accumulate_voice(self, sound, pitch, tmin: float, tmax: float, weight: int):
+        """Voiced-frame weighted voice-quality measures over the block (margins excluded)"""
+        try:
+            point_process = parselmouth.praat.call([sound, pitch], "To PointProcess (cc)")
+            measures = voice_measures(sound, pitch, point_process, PITCH_FLOOR, PITCH_CEILING, tmin, tmax)
+        except parselmouth.PraatError:
+            return
+        for name in VOICE_QUALITY_FIELDS:
+            value = measures.get(name, np.nan)
+            if not np.isnan(value):
+                self.voice_sums[name] += value * weight
+                self.voice_weights[name] += weight
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Rolling-window metrics over the last ``window_seconds`` of analyzed audio"""
+        window_start = self.analyzed_until - self.window_seconds
+        f0 = RunningStats()
+        f0.update(self.f0_window.values())
+        recent_f0 = self.f0_window.values()[-50:]
+        recent_f0 = recent_f0[~np.isnan(recent_f0)]
+        rms = RunningStats()
+        rms_values = self.rms_window.values()
+        rms.update(rms_values)
+        window_pauses = [p for p in self.pause_segments if p["end"] > window_start]
+        paused = sum(p["end"] - max(p["start"], window_start) for p in window_pauses)
+        if self._pause_start is not None:
+            paused += self.analyzed_until - max(self._pause_start, window_start)
+        window_length = min(self.window_seconds, self.analyzed_until) or 1.0
+
+        return {
+            "time": self.analyzed_until,
+            "window_seconds": self.window_seconds,
+            "f0": {**f0.summary(), "current": float(recent_f0[-1]) if len(recent_f0) else 0.0},
+            "rms": {**rms.summary(), "current": float(rms_values[-1]) if len(rms_values) else 0.0},
+            "pauses": {
+                "count": len(window_pauses),
+                "pause_ratio": min(paused / window_length, 1.0),
+                "in_pause": self._pause_start is not None,
+                "threshold": self.pause_threshold,
+            },
+        }
+
+    def finalize(self) -> Dict[str, Any]:
+        """Flush buffered audio and summarize the session in analyze_prosody's schema (without WPM)"""
+        empty = np.zeros(0, dtype=np.float32)
+        self._advance_rms(empty, final=True)
+        with self.timed("pitch"):
+            self._advance_pitch(empty, final=True)
+        if self._pause_start is not None:
+            self._close_pause(self.analyzed_until)
+
+        # Exact mean/std/min/max from the running stats; percentiles, semitone range and
+        # phrase slopes from the bucketed timeline (phrases need MIN_PHRASE_FRAMES buckets)
+        f0_timeline = self.f0_timeline.finish(self.duration)
+        bucket_f0 = np.nan_to_num(decode_values(f0_timeline).astype(np.float64))
+        f0 = {**f0_statistics(bucket_f0, timeline_times(f0_timeline)), **self.f0_stats.summary(), "timeline": f0_timeline}
+
+        return {
+            "f0": f0,
+            "rms": {**self.rms_stats.summary(), "timeline": self.rms_timeline.finish(self.duration)},
+            "jitter_shimmer": {
+                name: self.voice_sums[name] / self.voice_weights[name] if self.voice_weights[name] else 0.0
+                for name in VOICE_QUALITY_FIELDS
+            },
+            "pauses": {
+                "count": self.pause_count,
+                "total_duration": self.pause_total,
+                "average_duration": self.pause_total / self.pause_count if self.pause_count else 0.0,
+                "segments": list(self.pause_segments),
+            },
+            "audio_duration": self.duration,
+            "timings": dict(self.timings),
+        }
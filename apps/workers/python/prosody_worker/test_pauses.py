@@ -0,0 +1,51 @@
+"""Vectorized pause segmentation against the original per-frame loop"""
+
+import numpy as np
+import pytest
+
+from benchmark import reference_pause_segments
+from pauses import MIN_PAUSE_DURATION, find_pause_segments, pause_summary
+
+MIN_DURATIONS = (0.0, MIN_PAUSE_DURATION, 0.5)
+
+
+def uniform_times(n_frames: int, hop: float = 0.010) -> np.ndarray:
+    return np.arange(n_frames) * hop
+
+
+EDGE_MASKS = {
+    "empty": np.zeros(0, dtype=bool),
+    "single-pause-frame": np.ones(1, dtype=bool),
+    "single-voiced-frame": np.zeros(1, dtype=bool),
+    "all-pause": np.ones(50, dtype=bool),
+    "no-pause": np.zeros(50, dtype=bool),
+    "pause-at-edges": np.array([True] * 20 + [False] * 10 + [True] * 20),
+}
+
+
+def random_cases(n_masks: int = 200, seed: int = 0):
+    """Random masks at sparse, even and dense pause rates, with jittered frame times"""
+    rng = np.random.default_rng(seed)
+    for i in range(n_masks):
+        n_frames = int(rng.integers(2, 400))
+        mask = rng.random(n_frames) < (0.05, 0.5, 0.95)[i % 3]
+        times = np.cumsum(rng.uniform(0.005, 0.05, size=n_frames))
+        yield mask, times
+
+
+@pytest.mark.parametrize("min_duration", MIN_DURATIONS)
+@pytest.mark.parametrize("name", sorted(EDGE_MASKS))
+def test_edge_masks_match_reference(name, min_duration):
+    mask = EDGE_MASKS[name]
+    times = uniform_times(len(mask))
+    segments = find_pause_segments(mask, times, min_duration)
+    assert segments.to_dicts() == reference_pause_segments(mask, times, min_duration)
+
+
+@pytest.mark.parametrize("min_duration", MIN_DURATIONS)
+def test_random_masks_match_reference(min_duration):
+    for mask, times in random_cases():
+        expected = reference_pause_segments(mask, times, min_duration)
+        segments = find_pause_segments(mask, times, min_duration)
+        assert segments.to_dicts() == expected
+        assert pause_summary(segments)["total_duration"] == pytest.approx(sum(p["duration"] for p in expected))
@@ -0,0 +1,158 @@
+"""
+Timeline Encoding - Compact columnar form for uniformly sampled prosody series
+A timeline is stored as its start time, hop and a little-endian float32 array
+(base64 in JSON) instead of one {"timestamp", "value"} object per frame. Unvoiced
+or missing frames are NaN and are dropped when expanding back to the JSON form.
+"""
+
+import base64
+import json
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+COLUMNAR_ENCODING = "columnar"
+TIMELINE_METRICS = ("f0", "rms", "wpm")
+
+# Levels of detail (bucket seconds) precomputed for chart queries
+PYRAMID_LEVELS = (0.1, 1.0, 10.0)
+PYRAMID_STATS = ("min", "max", "mean")
+
+
+def _encode_values(values: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def _decode_values(encoded: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(encoded), dtype="<f4")
+
+
+def encode_timeline(values: np.ndarray, start: float, hop: float) -> Dict[str, Any]:
+    data = np.ascontiguousarray(values, dtype="<f4")
+    return {
+        "encoding": COLUMNAR_ENCODING,
+        "start": float(start),
+        "hop": float(hop),
+        "dtype": "float32",
+        "length": int(len(data)),
+        "values": _encode_values(data),
+    }
+
+
+def is_columnar(timeline: Any) -> bool:
+    return isinstance(timeline, dict) and timeline.get("encoding") == COLUMNAR_ENCODING
+
+
+def decode_values(timeline: Dict[str, Any], column: str = "values") -> np.ndarray:
+    return _decode_values(timeline[column])
+
+
+def timeline_times(timeline: Dict[str, Any]) -> np.ndarray:
+    return timeline["start"] + np.arange(timeline["length"]) * timeline["hop"]
+
+
+def timeline_to_points(timeline: Any) -> List[Dict[str, float]]:
+    """Expand a columnar timeline to the legacy list of {"timestamp", "value"} points"""
+    if not is_columnar(timeline):
+        return timeline or []
+    values = decode_values(timeline)
+    times = timeline_times(timeline)
+    present = ~np.isnan(values)
+    return [
+        {"timestamp": t, "value": v}
+        for t, v in zip(times[present].tolist(), values[present].astype(np.float64).tolist())
+    ]
+
+
+def expand_timelines(prosody_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a prosody result with every columnar timeline in JSON point form"""
+    expanded = dict(prosody_data)
+    for metric in TIMELINE_METRICS:
+        section = prosody_data.get(metric)
+        if isinstance(section, dict):
+            expanded[metric] = {
+                key: timeline_to_points(value) if key.endswith("timeline") else value
+                for key, value in section.items()
+            }
+    return expanded
+
+
+def build_level(timeline: Dict[str, Any], bucket_seconds: float) -> Dict[str, Any]:
+    """Min/max/mean of a columnar timeline over fixed buckets; all-NaN buckets stay NaN"""
+    values = decode_values(timeline).astype(np.float64)
+    per_bucket = max(1, int(round(bucket_seconds / timeline["hop"])))
+    n_buckets = -(-len(values) // per_bucket)
+    padded = np.full(n_buckets * per_bucket, np.nan)
+    padded[:len(values)] = values
+    buckets = padded.reshape(n_buckets, per_bucket)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        stats = {
+            "min": np.nanmin(buckets, axis=1),
+            "max": np.nanmax(buckets, axis=1),
+            "mean": np.nanmean(buckets, axis=1),
+        }
+
+    return {
+        "encoding": COLUMNAR_ENCODING,
+        "start": timeline["start"],
+        "hop": per_bucket * timeline["hop"],
+        "dtype": "float32",
+        "length": n_buckets,
+        **{name: _encode_values(column) for name, column in stats.items()},
+    }
+
+
+def pyramid_levels(timeline: Dict[str, Any], levels=PYRAMID_LEVELS) -> List[float]:
+    """Levels no finer than the timeline's own hop; a finer one would only be a relabelled copy of the source"""
+    return [level for level in levels if level >= timeline["hop"] * (1 - 1e-6)]
+
+
+def build_pyramids(prosody_data: Dict[str, Any], levels=PYRAMID_LEVELS) -> Dict[str, str]:
+    """Serialized pyramid levels keyed "<metric>:<level>", "<metric>:raw" for the full series, and "meta"
+
+    "meta" holds the audio duration and the levels built for each metric.
+    """
+    fields = {}
+    built = {}
+    for metric in TIMELINE_METRICS:
+        timeline = (prosody_data.get(metric) or {}).get("timeline")
+        if not is_columnar(timeline):
+            continue
+        fields[f"{metric}:raw"] = json.dumps(timeline)
+        built[metric] = pyramid_levels(timeline, levels)
+        for level in built[metric]:
+            fields[f"{metric}:{level:g}"] = json.dumps(build_level(timeline, level))
+    fields["meta"] = json.dumps({"duration": prosody_data.get("audio_duration"), "levels": built})
+    return fields
+
+
+def window_bounds(level: Dict[str, Any], start: Optional[float], end: Optional[float]):
+    """Index range of the buckets overlapping [start, end)"""
+    first = 0 if start is None else int(np.floor((start - level["start"]) / level["hop"]))
+    last = level["length"] if end is None else int(np.ceil((end - level["start"]) / level["hop"]))
+    first = min(max(first, 0), level["length"])
+    return first, min(max(last, first), level["length"])
+
+
+def slice_level(level: Dict[str, Any], start: Optional[float], end: Optional[float]) -> Dict[str, Any]:
+    """Restrict a raw timeline or pyramid level to the buckets overlapping [start, end)"""
+    first, last = window_bounds(level, start, end)
+    sliced = dict(level, start=level["start"] + first * level["hop"], length=last - first)
+    for column in ("values", *PYRAMID_STATS):
+        if column in level:
+            sliced[column] = _encode_values(_decode_values(level[column])[first:last])
+    return sliced
+
+
+def level_to_points(level: Dict[str, Any]) -> List[Dict[str, float]]:
+    """Expand a pyramid level to {"timestamp", "min", "max", "mean"} points, skipping empty buckets"""
+    if "values" in level:
+        return timeline_to_points(level)
+    columns = {name: _decode_values(level[name]).astype(np.float64) for name in PYRAMID_STATS}
+    times = timeline_times(level)
+    present = ~np.isnan(columns["mean"])
+    rows = zip(times[present].tolist(), *(columns[name][present].tolist() for name in PYRAMID_STATS))
+    return [{"timestamp": t, "min": lo, "max": hi, "mean": mean} for t, lo, hi, mean in rows]
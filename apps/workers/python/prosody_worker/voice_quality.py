@@ -0,0 +1,101 @@
+"""
+Voice Quality - Jitter, shimmer and HNR from a single Praat voice report
+One "Voice report" over the shared Sound, Pitch and periodic PointProcess yields
+every jitter and shimmer variant plus harmonicity, instead of one Praat call per
+measure. The point process comes from "To PointProcess (cc)", which only places
+pulses in frames the pitch track marks as voiced. PROSODY_VOICE_REPORT=0 switches
+back to the previous one-call-per-measure path.
+"""
+
+import math
+import os
+import re
+from typing import Dict
+
+import parselmouth
+
+MAX_PERIOD_FACTOR = 1.3
+MAX_AMPLITUDE_FACTOR = 1.6
+SILENCE_THRESHOLD = 0.03
+VOICING_THRESHOLD = 0.45
+MIN_PERIOD = 0.0001
+MAX_PERIOD = 0.02
+USE_VOICE_REPORT = os.getenv("PROSODY_VOICE_REPORT", "1") != "0"
+
+REPORT_FIELDS = {
+    "Jitter (local)": "jitter_local",
+    "Jitter (local, absolute)": "jitter_local_absolute",
+    "Jitter (rap)": "jitter_rap",
+    "Jitter (ppq5)": "jitter_ppq5",
+    "Jitter (ddp)": "jitter_ddp",
+    "Shimmer (local)": "shimmer_local",
+    "Shimmer (local, dB)": "shimmer_local_db",
+    "Shimmer (apq3)": "shimmer_apq3",
+    "Shimmer (apq5)": "shimmer_apq5",
+    "Shimmer (apq11)": "shimmer_apq11",
+    "Shimmer (dda)": "shimmer_dda",
+    "Mean harmonics-to-noise ratio": "hnr",
+}
+# Measures reported by analyze_jitter_shimmer
+VOICE_QUALITY_FIELDS = ("jitter_local", "shimmer_local", "jitter_rap", "jitter_ppq5", "shimmer_apq3", "shimmer_apq5", "hnr")
+
+REPORT_LINE = re.compile(r"^\s*(?P<label>[^:\n]+):\s*(?P<value>--undefined--|[-+]?[\d.]+(?:E[-+]?\d+)?)\s*(?P<unit>%)?", re.MULTILINE)
+
+
+def parse_voice_report(report: str) -> Dict[str, float]:
+    """Known measures from a Praat voice report; percentages become fractions, undefined becomes NaN"""
+    measures = {}
+    for match in REPORT_LINE.finditer(report):
+        key = REPORT_FIELDS.get(match["label"].strip())
+        if key is None:
+            continue
+        if match["value"] == "--undefined--":
+            measures[key] = math.nan
+            continue
+        value = float(match["value"])
+        measures[key] = value / 100 if match["unit"] else value
+    return measures
+
+
+def voice_report(sound: parselmouth.Sound, pitch: parselmouth.Pitch, point_process: parselmouth.Data,
+                 pitch_floor: float, pitch_ceiling: float, tmin: float = 0.0, tmax: float = 0.0) -> Dict[str, float]:
+    """All voice-quality measures over [tmin, tmax] (whole sound when both are 0)"""
+    report = parselmouth.praat.call(
+        [sound, pitch, point_process], "Voice report", tmin, tmax, pitch_floor, pitch_ceiling,
+        MAX_PERIOD_FACTOR, MAX_AMPLITUDE_FACTOR, SILENCE_THRESHOLD, VOICING_THRESHOLD,
+    )
+    return parse_voice_report(report)
+
+
+def per_measure_voice_quality(sound: parselmouth.Sound, point_process: parselmouth.Data,
+                              tmin: float = 0.0, tmax: float = 0.0) -> Dict[str, float]:
+    """The reported measures with one Praat call each; HNR is the mean cross-correlation harmonicity"""
+    jitter_args = (tmin, tmax, MIN_PERIOD, MAX_PERIOD, MAX_PERIOD_FACTOR)
+    shimmer_args = (*jitter_args, MAX_AMPLITUDE_FACTOR)
+    call = parselmouth.praat.call
+    return {
+        "jitter_local": call(point_process, "Get jitter (local)...", *jitter_args),
+        "shimmer_local": call([sound, point_process], "Get shimmer (local)...", *shimmer_args),
+        "jitter_rap": call(point_process, "Get jitter (rap)...", *jitter_args),
+        "jitter_ppq5": call(point_process, "Get jitter (ppq5)...", *jitter_args),
+        "shimmer_apq3": call([sound, point_process], "Get shimmer (apq3)...", *shimmer_args),
+        "shimmer_apq5": call([sound, point_process], "Get shimmer (apq5)...", *shimmer_args),
+        "hnr": call(sound.to_harmonicity_cc(), "Get mean", tmin, tmax),
+    }
+
+
+def voice_measures(sound: parselmouth.Sound, pitch: parselmouth.Pitch, point_process: parselmouth.Data,
+                   pitch_floor: float, pitch_ceiling: float, tmin: float = 0.0, tmax: float = 0.0) -> Dict[str, float]:
+    """Voice-quality measures from the voice report, or per measure when PROSODY_VOICE_REPORT=0"""
+    if USE_VOICE_REPORT:
+        return voice_report(sound, pitch, point_process, pitch_floor, pitch_ceiling, tmin, tmax)
+    return per_measure_voice_quality(sound, point_process, tmin, tmax)
+
+
+def voice_quality_stats(measures: Dict[str, float]) -> Dict[str, float]:
+    """The analyze_jitter_shimmer schema, with undefined measures reported as 0.0"""
+    stats = {}
+    for key in VOICE_QUALITY_FIELDS:
+        value = measures.get(key, math.nan)
+        stats[key] = 0.0 if math.isnan(value) else float(value)
+    return stats
@@ -0,0 +1,192 @@
+"""
+Shared Audio Cache - Node-local cache of decoded session audio
+Stores 16 kHz mono float32 PCM as .npy files keyed by the SHA-256 of the uploaded
+bytes, with a URL index so co-located workers (ASR, prosody) can skip both the
+second download and the second decode. The index is keyed on the full URL with
+only presigning parameters removed, and its entries expire after
+AUDIO_CACHE_URL_TTL so an object re-uploaded under the same URL is fetched
+again. Entries are memory-mapped on read and evicted least-recently-used once
+the directory exceeds its size budget.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "audio-cache"))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024)))
+AUDIO_CACHE_URL_TTL = float(os.getenv("AUDIO_CACHE_URL_TTL", "3600"))  # seconds a URL -> content mapping is trusted
+
+# Query parameters that only sign or expire a URL (S3 SigV2/SigV4, GCS, CloudFront, Azure SAS)
+SIGNATURE_PARAMS = {
+    "signature", "expires", "awsaccesskeyid", "x-amz-signature", "x-amz-credential", "x-amz-date",
+    "x-amz-expires", "x-amz-security-token", "x-amz-signedheaders", "x-amz-algorithm",
+    "x-goog-signature", "x-goog-credential", "x-goog-date", "x-goog-expires", "x-goog-signedheaders",
+    "x-goog-algorithm", "policy", "key-pair-id", "sig", "se", "st", "sp", "sv", "spr", "skoid", "sktid",
+    "skt", "ske", "sks", "skv",
+}
+
+
+def decode_pcm(audio_path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode any ffmpeg-readable file to mono float32 PCM at ``sr`` (same pipeline as whisperx.load_audio)"""
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", audio_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def normalize_url(url: str) -> str:
+    """The URL with presigning parameters dropped and the remaining query sorted"""
+    parsed = urlparse(url)
+    query = sorted((name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if name.lower() not in SIGNATURE_PARAMS)
+    return parsed._replace(query=urlencode(query), fragment="").geturl()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SharedAudioCache:
+    """Directory-backed PCM cache shared by every worker process on the node"""
+
+    def __init__(self, root: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES, url_ttl: float = AUDIO_CACHE_URL_TTL):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        (self.root / "pcm").mkdir(parents=True, exist_ok=True)
+        (self.root / "urls").mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.url_hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def _locked(self):
+        """Cross-process lock around writes and eviction"""
+        with open(self.root / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _pcm_path(self, key: str) -> Path:
+        return self.root / "pcm" / f"{key}.npy"
+
+    def _url_path(self, url: str) -> Path:
+        # Only signing parameters are ignored, so re-signed URLs for one object share an entry
+        return self.root / "urls" / hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        path = self._url_path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.url_ttl:
+                # The object behind the URL may have been replaced since it was indexed
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        """Memory-map a cached entry and mark it recently used"""
+        path = self._pcm_path(key)
+        try:
+            pcm = np.load(path, mmap_mode="r")
+            os.utime(path)
+            return pcm
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def store(self, key: str, pcm: np.ndarray, url: Optional[str] = None) -> np.ndarray:
+        path = self._pcm_path(key)
+        with self._locked():
+            if not path.exists():
+                fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, np.ascontiguousarray(pcm, dtype=np.float32))
+                os.replace(temp_path, path)
+            if url:
+                self._url_path(url).write_text(key)
+            self._evict(keep=path)
+        return np.load(path, mmap_mode="r")
+
+    def get_or_decode(self, audio_path: str, url: Optional[str] = None, decode: Callable[[str], np.ndarray] = decode_pcm) -> Tuple[np.ndarray, str]:
+        """Return (pcm, content key) for a downloaded file, decoding only on a cache miss"""
+        key = file_sha256(audio_path)
+        pcm = self.load(key)
+        if pcm is not None:
+            self.hits += 1
+            if url:
+                self._url_path(url).write_text(key)
+            return pcm, key
+        self.misses += 1
+        return self.store(key, decode(audio_path), url), key
+
+    def cached(self, url: str) -> Optional[Tuple[np.ndarray, str]]:
+        """(pcm, content key) when a worker on this node already decoded ``url``, else None"""
+        key = self.lookup_url(url)
+        if key:
+            pcm = self.load(key)
+            if pcm is not None:
+                self.url_hits += 1
+                return pcm, key
+        return None
+
+    async def fetch(self, url: str, download: Callable[[str], Awaitable[str]], decode: Callable[[str], np.ndarray] = decode_pcm) -> Tuple[np.ndarray, str]:
+        """Resolve session audio by URL, downloading and decoding only when no worker on this node has"""
+        cached = self.cached(url)
+        if cached:
+            return cached
+
+        audio_path = await download(url)
+        try:
+            return await asyncio.to_thread(self.get_or_decode, audio_path, url, decode)
+        finally:
+            if os.path.exists(audio_path):
+                os.unlink(audio_path)
+
+    def _evict(self, keep: Optional[Path] = None):
+        entries = []
+        for path in (self.root / "pcm").glob("*.npy"):
+            if path == keep:
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries) + (keep.stat().st_size if keep else 0)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted cached PCM: {path.name}")
+
+    def stats(self):
+        lookups = self.hits + self.url_hits + self.misses
+        return {
+            "hits": self.hits,
+            "url_hits": self.url_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.url_hits) / lookups, 3) if lookups else 0.0,
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+        }
@@ -0,0 +1,207 @@
+"""
+Media Fetcher - Shared async download helper for worker services
+Pooled HTTP client with large buffers, parallel ranged downloads for big objects,
+and local file:// / s3:// (MinIO path-style) stand-ins for development.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+S3_ENDPOINT = os.getenv("S3_ENDPOINT", "http://localhost:9000")
+FETCH_BUFFER_SIZE = int(os.getenv("FETCH_BUFFER_SIZE", str(1024 * 1024)))
+FETCH_PARALLEL_THRESHOLD = int(os.getenv("FETCH_PARALLEL_THRESHOLD", str(32 * 1024 * 1024)))
+FETCH_PARALLEL_PARTS = int(os.getenv("FETCH_PARALLEL_PARTS", "4"))
+FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "32"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "300"))
+
+
+class RangeNotSatisfied(Exception):
+    """The server answered a ranged GET with something other than 206 Partial Content"""
+
+
+@dataclass
+class FetchStats:
+    url: str
+    source: str
+    bytes: int
+    seconds: float
+    parts: int = 1
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds > 0 else 0.0
+
+
+class MediaFetcher:
+    """Async downloader sharing one pooled HTTP client per worker process"""
+
+    def __init__(
+        self,
+        buffer_size: int = FETCH_BUFFER_SIZE,
+        parallel_threshold: int = FETCH_PARALLEL_THRESHOLD,
+        parallel_parts: int = FETCH_PARALLEL_PARTS,
+        max_connections: int = FETCH_MAX_CONNECTIONS,
+        timeout: float = FETCH_TIMEOUT,
+    ):
+        self.buffer_size = buffer_size
+        self.parallel_threshold = parallel_threshold
+        self.parallel_parts = parallel_parts
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._totals = {"downloads": 0, "failures": 0, "bytes": 0, "seconds": 0.0}
+        self._last: Optional[FetchStats] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_to_tempfile(self, url: str, suffix: str = "") -> Tuple[str, FetchStats]:
+        """Download ``url`` into a new temporary file and return its path"""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        temp_path = temp_file.name
+        temp_file.close()
+        try:
+            return temp_path, await self.fetch_to(url, temp_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    async def fetch_to(self, url: str, dest_path: str) -> FetchStats:
+        """Download ``url`` to ``dest_path``, choosing local copy, single stream or ranged parts"""
+        started = time.perf_counter()
+        try:
+            parsed = urlparse(url)
+            if parsed.scheme in ("", "file"):
+                source = "file"
+                size = await asyncio.to_thread(self._copy_local, parsed.path or url, dest_path)
+                parts = 1
+            else:
+                source = "s3" if parsed.scheme == "s3" else "http"
+                http_url = self._resolve_http_url(url)
+                size, parts = await self._fetch_http(http_url, dest_path)
+        except Exception:
+            self._totals["failures"] += 1
+            raise
+
+        stats = FetchStats(url=url, source=source, bytes=size, seconds=time.perf_counter() - started, parts=parts)
+        self._totals["downloads"] += 1
+        self._totals["bytes"] += stats.bytes
+        self._totals["seconds"] += stats.seconds
+        self._last = stats
+        logger.info(f"Fetched {stats.bytes / (1024 * 1024):.1f} MB from {source} in {stats.seconds:.2f}s "
+                    f"({stats.megabytes_per_second:.1f} MB/s, {parts} part(s))")
+        return stats
+
+    def metrics(self) -> Dict[str, Any]:
+        seconds = self._totals["seconds"]
+        return {
+            **self._totals,
+            "seconds": round(seconds, 3),
+            "avg_mb_per_second": round(self._totals["bytes"] / (1024 * 1024) / seconds, 2) if seconds > 0 else 0.0,
+            "last_mb_per_second": round(self._last.megabytes_per_second, 2) if self._last else None,
+        }
+
+    @staticmethod
+    def _resolve_http_url(url: str) -> str:
+        """Map s3://bucket/key onto the configured S3-compatible endpoint (path-style)"""
+        parsed = urlparse(url)
+        if parsed.scheme == "s3":
+            return f"{S3_ENDPOINT.rstrip('/')}/{parsed.netloc}/{parsed.path.lstrip('/')}"
+        return url
+
+    def _copy_local(self, source_path: str, dest_path: str) -> int:
+        shutil.copyfile(source_path, dest_path)
+        return os.path.getsize(dest_path)
+
+    async def _fetch_http(self, url: str, dest_path: str) -> Tuple[int, int]:
+        size, accepts_ranges = await self._probe(url)
+        if size and accepts_ranges and size >= self.parallel_threshold and self.parallel_parts > 1:
+            try:
+                await self._fetch_ranges(url, dest_path, size)
+                return size, self.parallel_parts
+            except RangeNotSatisfied as e:
+                # Advertised range support is not honoured (e.g. a proxy or signed URL); one plain GET instead
+                logger.warning(f"Ranged download unavailable, falling back to a single stream: {e}")
+        return await self._fetch_stream(url, dest_path), 1
+
+    async def _probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """HEAD the object for its size and range support; failures fall back to a plain GET"""
+        try:
+            response = await self.client.head(url)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None, False
+        length = response.headers.get("content-length")
+        accepts_ranges = response.headers.get("accept-ranges", "").lower() == "bytes"
+        return (int(length) if length else None), accepts_ranges
+
+    async def _fetch_stream(self, url: str, dest_path: str) -> int:
+        written = 0
+        fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(self.buffer_size):
+                    await asyncio.to_thread(os.pwrite, fd, chunk, written)
+                    written += len(chunk)
+        finally:
+            os.close(fd)
+        return written
+
+    async def _fetch_ranges(self, url: str, dest_path: str, size: int):
+        part_size = -(-size // self.parallel_parts)
+        fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, size)
+
+            async def fetch_part(start: int, end: int):
+                offset = start
+                async with self.client.stream("GET", url, headers={"Range": f"bytes={start}-{end}"}) as response:
+                    if response.status_code != 206:
+                        raise RangeNotSatisfied(f"expected 206 for bytes {start}-{end}, got {response.status_code}")
+                    async for chunk in response.aiter_bytes(self.buffer_size):
+                        await asyncio.to_thread(os.pwrite, fd, chunk, offset)
+                        offset += len(chunk)
+                if offset != end + 1:
+                    raise IOError(f"Short read for bytes {start}-{end}: got {offset - start} bytes")
+
+            tasks = [
+                asyncio.ensure_future(fetch_part(start, min(start + part_size, size) - 1))
+                for start in range(0, size, part_size)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the remaining parts before their file descriptor is closed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        finally:
+            os.close(fd)
+
+
+media_fetcher = MediaFetcher()
@@ -0,0 +1,313 @@
+"""
+Metrics Sink - Bulk columnar writes of metric series into coaching.metrics
+Workers submit every series of one session together (each series is one metric
+as parallel time/value arrays). A background task groups sessions into batches
+of rows and writes each batch in one transaction that deletes the sessions'
+previous rows and COPYs the new ones (Postgres/TimescaleDB via asyncpg), or the
+same with executemany (SQLite stand-in for local runs and tests), so
+re-analysis replaces a session's series instead of appending to it. The submit
+queue is bounded, so producers wait when the database falls behind, and failed
+batches are retried with backoff before being dropped.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import asyncpg
+except ImportError:  # only needed for the Postgres backend
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_COLUMNS = ("time", "session_id", "metric_type", "value", "metadata")
+
+
+@dataclass
+class MetricSeries:
+    """One metric for one session: value[i] was measured at start + offsets[i] seconds"""
+    session_id: str
+    metric_type: str
+    start: datetime
+    offsets: np.ndarray
+    values: np.ndarray
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # NaN marks "no measurement" (e.g. unvoiced F0) and is not stored
+        present = ~np.isnan(self.values)
+        self.offsets = np.asarray(self.offsets, dtype=np.float64)[present]
+        self.values = np.asarray(self.values, dtype=np.float64)[present]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def times(self) -> List[datetime]:
+        return [self.start + timedelta(seconds=offset) for offset in self.offsets.tolist()]
+
+
+# One batch: the complete series set of each session it covers
+SessionBatch = Dict[str, List[MetricSeries]]
+
+
+class PostgresBackend:
+    """COPY into coaching.metrics over an asyncpg pool"""
+
+    def __init__(self, dsn: str, schema: str = "coaching", table: str = "metrics"):
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is required for the Postgres metrics backend")
+        self.dsn = dsn
+        self.schema = schema
+        self.table = table
+        self.pool = None
+
+    async def connect(self):
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+
+    async def write(self, batch: SessionBatch):
+        records = []
+        for session_series in batch.values():
+            for series in session_series:
+                metadata = json.dumps(series.metadata)
+                records.extend(
+                    (t, series.session_id, series.metric_type, v, metadata)
+                    for t, v in zip(series.times(), series.values.tolist())
+                )
+        async with self.pool.acquire() as conn:
+            # Replace, not append: the sessions' previous rows go in the same transaction
+            async with conn.transaction():
+                await conn.execute(
+                    f"DELETE FROM {self.schema}.{self.table} WHERE session_id = ANY($1::uuid[])", list(batch)
+                )
+                await conn.copy_records_to_table(self.table, schema_name=self.schema, columns=METRICS_COLUMNS, records=records)
+
+    async def session_start(self, session_id: str) -> Optional[datetime]:
+        """Recorded start of a session: its creation time, else the time base of its stored series"""
+        query = f"""
+            SELECT COALESCE(
+                (SELECT created_at FROM {self.schema}.sessions WHERE id = $1::uuid),
+                (SELECT min(time) FROM {self.schema}.{self.table} WHERE session_id = $1::uuid)
+            )
+        """
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(query, session_id)
+
+    async def aggregate_per_minute(self, session_id: str) -> List[Dict[str, Any]]:
+        # Buckets start at the session's first sample, so minute 0 is the first minute of the recording
+        query = f"""
+            WITH session AS (
+                SELECT * FROM {self.schema}.{self.table} WHERE session_id = $1::uuid
+            )
+            SELECT time_bucket('1 minute', time, origin => (SELECT min(time) FROM session)) AS minute, metric_type,
+                   avg(value) AS mean, min(value) AS min, max(value) AS max, count(*) AS count
+            FROM session
+            GROUP BY minute, metric_type
+            ORDER BY minute, metric_type
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, session_id)
+        if not rows:
+            return []
+        origin = rows[0]["minute"]
+        return [
+            {**dict(row), "minute": int((row["minute"] - origin).total_seconds() // 60), "start": row["minute"].isoformat()}
+            for row in rows
+        ]
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+
+class SQLiteBackend:
+    """Local stand-in with the same columns; time is stored as epoch seconds"""
+
+    def __init__(self, path: str, table: str = "metrics"):
+        self.path = path
+        self.table = table
+        self.conn: Optional[sqlite3.Connection] = None
+
+    async def connect(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(time REAL NOT NULL, session_id TEXT, metric_type TEXT NOT NULL, value REAL NOT NULL, metadata TEXT DEFAULT '{}')"
+        )
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_session_id ON {self.table}(session_id)")
+        self.conn.commit()
+
+    def _write(self, batch: SessionBatch):
+        with self.conn:
+            self.conn.executemany(f"DELETE FROM {self.table} WHERE session_id = ?", [(session_id,) for session_id in batch])
+            for session_series in batch.values():
+                for series in session_series:
+                    epoch = (series.start.timestamp() + series.offsets).tolist()
+                    self.conn.executemany(
+                        f"INSERT INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+                        zip(epoch, [series.session_id] * len(series), [series.metric_type] * len(series),
+                            series.values.tolist(), [json.dumps(series.metadata)] * len(series)),
+                    )
+
+    async def write(self, batch: SessionBatch):
+        await asyncio.to_thread(self._write, batch)
+
+    def _session_start(self, session_id: str) -> Optional[datetime]:
+        (start,) = self.conn.execute(f"SELECT min(time) FROM {self.table} WHERE session_id = ?", (session_id,)).fetchone()
+        return datetime.fromtimestamp(start, timezone.utc) if start is not None else None
+
+    async def session_start(self, session_id: str) -> Optional[datetime]:
+        """Time base of the session's stored series (there is no sessions table locally)"""
+        return await asyncio.to_thread(self._session_start, session_id)
+
+    def _aggregate(self, session_id: str) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            f"SELECT CAST((time - (SELECT min(time) FROM {self.table} WHERE session_id = ?1)) / 60 AS INTEGER) AS minute, "
+            f"metric_type, avg(value), min(value), max(value), count(*) "
+            f"FROM {self.table} WHERE session_id = ?1 GROUP BY minute, metric_type ORDER BY minute, metric_type",
+            (session_id,),
+        ).fetchall()
+        origin = self._session_start(session_id)
+        return [
+            {
+                "minute": minute, "start": (origin + timedelta(minutes=minute)).isoformat(),
+                "metric_type": metric_type, "mean": mean, "min": low, "max": high, "count": count,
+            }
+            for minute, metric_type, mean, low, high, count in rows
+        ]
+
+    async def aggregate_per_minute(self, session_id: str) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._aggregate, session_id)
+
+    async def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def backend_from_url(url: str):
+    """postgresql://... (or postgres://...) for TimescaleDB, sqlite:///path for the local stand-in"""
+    if url.startswith(("postgresql://", "postgres://")):
+        return PostgresBackend(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported metrics sink URL: {url}")
+
+
+class MetricsSink:
+    """Bounded queue of per-session series sets flushed to the backend in row batches"""
+
+    def __init__(self, backend, batch_rows: int = 5000, flush_interval: float = 1.0,
+                 max_queued: int = 256, retries: int = 3, retry_backoff: float = 0.5):
+        self.backend = backend
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._task: Optional[asyncio.Task] = None
+        self.rows_written = 0
+        self.batches_written = 0
+        self.retried = 0
+        self.rows_dropped = 0
+        self.last_flush_ms = 0.0
+
+    async def start(self):
+        await self.backend.connect()
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, session_id: str, series: List[MetricSeries]):
+        """Queue the complete series set of a session, replacing what is stored for it; waits while the queue is full"""
+        await self.queue.put((session_id, series))
+
+    async def session_start(self, session_id: str) -> Optional[datetime]:
+        try:
+            return await self.backend.session_start(session_id)
+        except Exception as e:
+            logger.error(f"Failed to look up start time of session {session_id}: {e}")
+            return None
+
+    async def _run(self):
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                return
+            # A session is never split across batches; a later submission for it supersedes an earlier one
+            batch = dict([entry])
+            deadline = time.monotonic() + self.flush_interval
+            # Keep collecting until the batch is full or the flush interval passes
+            while self._rows(batch) < self.batch_rows:
+                try:
+                    entry = await asyncio.wait_for(self.queue.get(), max(deadline - time.monotonic(), 0.0))
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    await self._flush(batch)
+                    return
+                session_id, series = entry
+                batch[session_id] = series
+            await self._flush(batch)
+
+    @staticmethod
+    def _rows(batch: SessionBatch) -> int:
+        return sum(len(series) for session_series in batch.values() for series in session_series)
+
+    async def _flush(self, batch: SessionBatch):
+        rows = self._rows(batch)
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                await self.backend.write(batch)
+                self.rows_written += rows
+                self.batches_written += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self.rows_dropped += rows
+                    logger.error(f"Dropping {rows} metric rows after {attempt + 1} attempts: {e}")
+                    return
+                self.retried += 1
+                logger.warning(f"Metric batch write failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def aggregate_per_minute(self, session_id: str) -> List[Dict[str, Any]]:
+        return await self.backend.aggregate_per_minute(session_id)
+
+    async def close(self):
+        """Flush everything queued, then close the backend"""
+        if self._task:
+            await self.queue.put(None)
+            await self._task
+        await self.backend.close()
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "retries": self.retried,
+            "rows_dropped": self.rows_dropped,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+def metrics_sink_from_env() -> Optional[MetricsSink]:
+    """Sink configured by METRICS_SINK_URL (disabled when unset)"""
+    url = os.getenv("METRICS_SINK_URL")
+    if not url:
+        return None
+    return MetricsSink(
+        backend_from_url(url),
+        batch_rows=int(os.getenv("METRICS_SINK_BATCH_ROWS", "5000")),
+        flush_interval=float(os.getenv("METRICS_SINK_FLUSH_SECONDS", "1.0")),
+        max_queued=int(os.getenv("METRICS_SINK_MAX_QUEUED", "256")),
+        retries=int(os.getenv("METRICS_SINK_RETRIES", "3")),
+    )
@@ -0,0 +1,12 @@
+"""
+Run Detection - Shared run-length helpers for frame masks
+Used by the ASR energy VAD and the prosody pause segmentation.
+"""
+
+import numpy as np
+
+
+def mask_runs(mask: np.ndarray):
+    """Start and end indices (end exclusive) of consecutive True runs in a boolean mask"""
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)